@@ -0,0 +1 @@
+"""Benchmarks for the EPUB merge tool; run from the repository root with ``PYTHONPATH=src``."""
@@ -0,0 +1,160 @@
+"""Deterministic synthetic EPUB corpora for benchmarks."""
+
+from __future__ import annotations
+
+import math
+import random
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from epub_merge_tool.epub_io import write_epub_container, write_mimetype_first
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt. "
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of a generated series.
+
+    ``images`` are per volume, ``shared_images`` of which have identical bytes
+    in every volume so the merge pools them. ``toc`` is ``"nav"`` or
+    ``"ncx"``; ``toc_depth`` nests chapters under that many levels of parts.
+    """
+
+    volumes: int = 3
+    chapters: int = 20
+    paragraphs: int = 8
+    images: int = 4
+    image_size: int = 32 * 1024
+    shared_images: int = 2
+    toc: str = "nav"
+    toc_depth: int = 1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.volumes < 1 or self.chapters < 1:
+            raise ValueError("a corpus needs at least one volume and one chapter")
+        if not 0 <= self.shared_images <= self.images:
+            raise ValueError("shared_images must be between 0 and images")
+        if self.toc not in {"nav", "ncx"}:
+            raise ValueError("toc must be 'nav' or 'ncx'")
+        if self.toc_depth < 1:
+            raise ValueError("toc_depth must be at least 1")
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def generate_corpus(spec: CorpusSpec, out_dir: Path | str) -> list[Path]:
+    """Write ``spec.volumes`` EPUBs named ``Series <n>.epub`` and return their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+    shared = [_image_bytes(rng, spec.image_size) for _ in range(spec.shared_images)]
+    paths = []
+    for volume in range(1, spec.volumes + 1):
+        images = shared + [_image_bytes(rng, spec.image_size) for _ in range(spec.images - spec.shared_images)]
+        path = out_dir / f"Series {volume}.epub"
+        build_epub(path, f"Series Volume {volume}", spec, images)
+        paths.append(path)
+    return paths
+
+
+def build_epub(path: Path, title: str, spec: CorpusSpec, images: list[bytes]) -> None:
+    chapter_ids = [f"c{index}" for index in range(spec.chapters)]
+    tree = _toc_tree(list(range(spec.chapters)), spec.toc_depth)
+    manifest = [
+        f'<item id="{item_id}" href="text/{item_id}.xhtml" media-type="application/xhtml+xml"/>'
+        for item_id in chapter_ids
+    ]
+    manifest += [
+        f'<item id="img{index}" href="images/img{index}.png" media-type="image/png"/>' for index in range(len(images))
+    ]
+    if spec.toc == "nav":
+        manifest.append('<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>')
+        spine_attrs = ""
+    else:
+        manifest.append('<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>')
+        spine_attrs = ' toc="ncx"'
+    spine = "".join(f'<itemref idref="{item_id}"/>' for item_id in chapter_ids)
+    opf = f"""<?xml version="1.0" encoding="utf-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="bookid">
+<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+<dc:identifier id="bookid">urn:bench:{escape(title)}</dc:identifier><dc:title>{escape(title)}</dc:title><dc:language>en</dc:language>
+</metadata>
+<manifest>{"".join(manifest)}</manifest>
+<spine{spine_attrs}>{spine}</spine>
+</package>"""
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        write_mimetype_first(zf)
+        write_epub_container(zf)
+        zf.writestr("OEBPS/content.opf", opf)
+        if spec.toc == "nav":
+            zf.writestr("OEBPS/nav.xhtml", _nav(title, tree))
+        else:
+            zf.writestr("OEBPS/toc.ncx", _ncx(title, tree))
+        for index in range(spec.chapters):
+            image = f"../images/img{index % len(images)}.png" if images else None
+            zf.writestr(f"OEBPS/text/c{index}.xhtml", _chapter(index, spec.paragraphs, image))
+        for index, data in enumerate(images):
+            zf.writestr(f"OEBPS/images/img{index}.png", data, compress_type=zipfile.ZIP_STORED)
+
+
+def _image_bytes(rng: random.Random, size: int) -> bytes:
+    return PNG_SIGNATURE + rng.randbytes(max(size - len(PNG_SIGNATURE), 0))
+
+
+def _chapter(index: int, paragraphs: int, image: str | None) -> str:
+    body = "".join(f"<p>{PARAGRAPH * 4}</p>" for _ in range(paragraphs))
+    figure = f'<img src="{image}" alt=""/>' if image else ""
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Chapter {index + 1}</title></head>
+<body><h1>Chapter {index + 1}</h1>{figure}{body}</body></html>"""
+
+
+def _toc_tree(chapters: list[int], depth: int) -> list[tuple[str, int, list]]:
+    if depth == 1:
+        return [(f"Chapter {index + 1}", index, []) for index in chapters]
+    size = max(1, math.ceil(len(chapters) ** ((depth - 1) / depth)))
+    groups = [chapters[start : start + size] for start in range(0, len(chapters), size)]
+    return [
+        (f"Part {level_index + 1}", group[0], _toc_tree(group, depth - 1))
+        for level_index, group in enumerate(groups)
+    ]
+
+
+def _nav(title: str, tree: list) -> str:
+    def render(nodes: list) -> str:
+        items = "".join(
+            f'<li><a href="text/c{index}.xhtml">{escape(label)}</a>{render(children) if children else ""}</li>'
+            for label, index, children in nodes
+        )
+        return f"<ol>{items}</ol>"
+
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops"><head><title>{escape(title)}</title></head>
+<body><nav epub:type="toc">{render(tree)}</nav></body></html>"""
+
+
+def _ncx(title: str, tree: list) -> str:
+    counter = 0
+
+    def render(nodes: list) -> str:
+        nonlocal counter
+        points = []
+        for label, index, children in nodes:
+            counter += 1
+            points.append(
+                f'<navPoint id="p{counter}" playOrder="{counter}"><navLabel><text>{escape(label)}</text></navLabel>'
+                f'<content src="text/c{index}.xhtml"/>{render(children)}</navPoint>'
+            )
+        return "".join(points)
+
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">
+<head/><docTitle><text>{escape(title)}</text></docTitle><navMap>{render(tree)}</navMap></ncx>"""
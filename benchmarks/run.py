@@ -0,0 +1,176 @@
+"""Time merge, split and inspect on synthetic corpora and write JSON results.
+
+Run from the repository root:
+
+    PYTHONPATH=src python3 -m benchmarks.run --scales small medium --output bench.json
+    PYTHONPATH=src python3 -m benchmarks.run --output new.json --compare bench.json
+
+Each result keeps the best of ``--repeat`` runs. With ``--compare`` the run
+is checked against an earlier results file and exits with status 1 when any
+operation slower than ``--min-seconds`` got slower by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from epub_merge_tool import __version__
+from epub_merge_tool.inspect import inspect_epub
+from epub_merge_tool.merge import merge_epubs
+from epub_merge_tool.split import split_epub
+
+from .corpus import CorpusSpec, generate_corpus
+
+
+RESULTS_SCHEMA = "epub-merge-bench/v1"
+SCALES = {
+    "small": CorpusSpec(volumes=3, chapters=20, images=4, image_size=32 * 1024, shared_images=2),
+    "medium": CorpusSpec(volumes=10, chapters=200, images=20, image_size=64 * 1024, shared_images=5, toc_depth=2),
+    "large": CorpusSpec(volumes=30, chapters=400, images=20, image_size=128 * 1024, shared_images=8, toc_depth=3),
+    "ncx": CorpusSpec(volumes=10, chapters=200, images=10, image_size=64 * 1024, shared_images=5, toc="ncx"),
+}
+
+
+def run_scale(name: str, spec: CorpusSpec, *, repeat: int, workers: int, work: Path) -> list[dict]:
+    corpus = generate_corpus(spec, work / "corpus")
+    merged = work / "merged.epub"
+    input_bytes = sum(path.stat().st_size for path in corpus)
+
+    def merge() -> None:
+        merge_epubs(merged, corpus, workers=workers)
+
+    def split() -> None:
+        out_dir = work / "split"
+        shutil.rmtree(out_dir, ignore_errors=True)
+        split_epub(merged, out_dir, workers=workers)
+
+    results = [_measure(name, "merge", merge, repeat, input_bytes)]
+    merged_bytes = merged.stat().st_size
+    results.append(_measure(name, "split", split, repeat, merged_bytes))
+    results.append(_measure(name, "inspect", lambda: inspect_epub(merged), repeat, merged_bytes))
+    for result in results:
+        result["spec"] = spec.as_dict()
+        result["workers"] = workers
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_seconds: float = 0.0) -> list[dict]:
+    """Return one row per operation present in both runs, flagging regressions.
+
+    Operations faster than ``min_seconds`` in both runs are reported but never
+    flagged, since their timings are mostly noise.
+    """
+    previous = {(row["scale"], row["operation"]): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        old = previous.get((row["scale"], row["operation"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = row["seconds"] / old["seconds"]
+        rows.append(
+            {
+                "scale": row["scale"],
+                "operation": row["operation"],
+                "baseline": old["seconds"],
+                "current": row["seconds"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold and max(row["seconds"], old["seconds"]) >= min_seconds,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many runs")
+    parser.add_argument("--jobs", type=int, default=1, help="worker count passed to merge and split")
+    parser.add_argument("--output", type=Path, help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing, as a fraction")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.01,
+        help="never flag operations faster than this in both runs",
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.scales:
+        with tempfile.TemporaryDirectory(prefix=f"epub-merge-bench-{name}-") as tmp:
+            results.extend(run_scale(name, SCALES[name], repeat=args.repeat, workers=args.jobs, work=Path(tmp)))
+            print(f"{name}: done", file=sys.stderr)
+    report = {
+        "schema": RESULTS_SCHEMA,
+        "tool_version": __version__,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text + "\n", encoding="utf-8")
+
+    if args.compare is None:
+        return 0
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    if baseline.get("schema") != RESULTS_SCHEMA:
+        print(f"{args.compare}: not a benchmark results file", file=sys.stderr)
+        return 2
+    rows = compare(report, baseline, args.threshold, args.min_seconds)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['scale']:>8} {row['operation']:<8} {row['baseline']:>10.4f}s -> {row['current']:>10.4f}s"
+            f"  x{row['ratio']:.3f}{flag}",
+            file=sys.stderr,
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def _measure(scale: str, operation: str, run: Callable[[], object], repeat: int, input_bytes: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "scale": scale,
+        "operation": operation,
+        "seconds": round(best, 6),
+        "runs": [round(seconds, 6) for seconds in timings],
+        "input_bytes": input_bytes,
+        "mb_per_second": round(input_bytes / best / 1e6, 3) if best else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
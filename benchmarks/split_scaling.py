@@ -0,0 +1,52 @@
+"""Measure how split time grows with the number of chapters in a volume.
+
+Run from the repository root:
+
+    PYTHONPATH=src python3 -m benchmarks.split_scaling --chapters 1000 2000 4000 8000
+
+Each size builds a one-volume source EPUB, merges it, then times
+``split_epub`` on the merged file. Split should scale linearly, so the
+``us_per_chapter`` column ought to stay roughly flat as ``chapters`` grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from epub_merge_tool.merge import merge_epubs
+from epub_merge_tool.split import split_epub
+
+from .corpus import CorpusSpec, generate_corpus
+
+
+def measure(chapters: int, repeat: int, work: Path) -> dict:
+    spec = CorpusSpec(volumes=1, chapters=chapters, paragraphs=1, images=0, shared_images=0)
+    sources = generate_corpus(spec, work / f"corpus-{chapters}")
+    merged = work / f"merged-{chapters}.epub"
+    merge_epubs(merged, sources, input_order=True, source_digest="skip")
+    timings = []
+    for attempt in range(repeat):
+        started = time.perf_counter()
+        split_epub(merged, work / f"split-{chapters}-{attempt}")
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {"chapters": chapters, "seconds": round(best, 6), "us_per_chapter": round(best / chapters * 1e6, 2)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapters", type=int, nargs="+", default=[1000, 2000, 4000, 8000])
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many runs")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="epub-merge-bench-") as tmp:
+        for chapters in args.chapters:
+            print(json.dumps(measure(chapters, args.repeat, Path(tmp))), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
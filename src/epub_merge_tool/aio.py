@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+from .errors import EpubMergeError
+from .merge import merge_epubs
+from .progress import Progress
+from .split import split_epub
+
+
+async def merge_epubs_async(
+    output_path: Path | str | BinaryIO,
+    input_paths: list[Path | str],
+    *,
+    on_progress: Callable[[dict], object] | None = None,
+    executor: Executor | None = None,
+    **options: Any,
+) -> Path | BinaryIO:
+    """Run :func:`~epub_merge_tool.merge.merge_epubs` on an executor; cancelling the task cancels the merge."""
+    return await _run(merge_epubs, (output_path, input_paths), options, on_progress, executor)
+
+
+async def split_epub_async(
+    input_path: Path | str,
+    out_dir: Path | str,
+    *,
+    on_progress: Callable[[dict], object] | None = None,
+    executor: Executor | None = None,
+    **options: Any,
+) -> list[Path]:
+    """Run :func:`~epub_merge_tool.split.split_epub` on an executor; cancelling the task cancels the split."""
+    return await _run(split_epub, (input_path, out_dir), options, on_progress, executor)
+
+
+async def _run(
+    function: Callable[..., Any],
+    args: tuple,
+    options: dict[str, Any],
+    on_progress: Callable[[dict], object] | None,
+    executor: Executor | None,
+) -> Any:
+    if "progress" in options:
+        raise EpubMergeError("the async API creates its own Progress; pass on_progress instead of progress")
+    loop = asyncio.get_running_loop()
+    callback = None
+    if on_progress is not None:
+
+        def callback(event: dict) -> None:
+            loop.call_soon_threadsafe(on_progress, event)
+
+    progress = Progress(callback)
+    future = loop.run_in_executor(executor, functools.partial(function, *args, progress=progress, **options))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        progress.cancel()
+        await asyncio.wait({future})
+        if not future.cancelled():
+            future.exception()
+        raise
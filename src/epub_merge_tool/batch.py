@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .cache import SourceCache
+from .errors import EpubMergeError
+from .merge import merge_epubs
+from .pool import DigestMemo
+
+
+JOB_KEYS = {"output", "inputs", "title", "structure", "input_order", "compression"}
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    output: Path
+    inputs: tuple[Path, ...]
+    title: str | None = None
+    structure: str = "volume"
+    input_order: bool = False
+    compression: str | None = None
+
+
+@dataclass(frozen=True)
+class InvalidJob:
+    output: Path | None
+    error: str
+
+
+def load_jobs(path: Path | str) -> list[BatchJob | InvalidJob]:
+    """Read merge jobs from a JSON array or a JSONL file (``-`` reads stdin)."""
+    if str(path) == "-":
+        text = sys.stdin.read()
+        base = Path.cwd()
+    else:
+        job_file = Path(path).expanduser()
+        try:
+            text = job_file.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise EpubMergeError(f"Cannot read job file {job_file}: {exc}") from exc
+        base = job_file.parent
+
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        try:
+            records = json.loads(stripped)
+        except ValueError as exc:
+            raise EpubMergeError(f"Invalid job file: {exc}") from exc
+    else:
+        lines = [line for line in text.splitlines() if line.strip()]
+        records = [_parse_line(line, number) for number, line in enumerate(lines, start=1)]
+
+    jobs: list[BatchJob | InvalidJob] = []
+    for number, record in enumerate(records, start=1):
+        if isinstance(record, InvalidJob):
+            jobs.append(record)
+            continue
+        try:
+            jobs.append(_job_from_record(record, base, number))
+        except EpubMergeError as exc:
+            jobs.append(InvalidJob(_record_output(record, base), str(exc)))
+    outputs = [job.output.resolve() for job in jobs if isinstance(job, BatchJob)]
+    duplicates = {output for output in outputs if outputs.count(output) > 1}
+    return [
+        InvalidJob(job.output, f"Several jobs write the same output: {job.output}")
+        if isinstance(job, BatchJob) and job.output.resolve() in duplicates
+        else job
+        for job in jobs
+    ]
+
+
+def run_batch(
+    jobs: Iterable[BatchJob | InvalidJob],
+    *,
+    workers: int = 1,
+    cache: SourceCache | None = None,
+    source_digest: str = "eager",
+    pool_digest: str = "sha256",
+) -> Iterator[dict]:
+    """Run merge jobs on a thread pool, yielding one result per job as it finishes."""
+    if workers < 1:
+        raise EpubMergeError("workers must be at least 1")
+    cache = cache if cache is not None else SourceCache()
+    memo = DigestMemo()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        invalid = []
+        for index, job in enumerate(jobs):
+            if isinstance(job, InvalidJob):
+                invalid.append((index, job))
+            else:
+                futures[pool.submit(_run_job, job, cache, memo, source_digest, pool_digest)] = (index, job)
+        for index, job in invalid:
+            yield {
+                "index": index,
+                "output": None if job.output is None else str(job.output),
+                "status": "error",
+                "seconds": 0.0,
+                "error": job.error,
+                "type": EpubMergeError.__name__,
+            }
+        for future in as_completed(futures):
+            index, job = futures[future]
+            yield {"index": index, "output": str(job.output), **future.result()}
+
+
+def _run_job(job: BatchJob, cache: SourceCache, memo: DigestMemo, source_digest: str, pool_digest: str) -> dict:
+    started = time.perf_counter()
+    try:
+        merge_epubs(
+            job.output,
+            list(job.inputs),
+            title=job.title,
+            structure=job.structure,
+            input_order=job.input_order,
+            source_digest=source_digest,
+            compression=job.compression,
+            cache=cache,
+            pool_digest=pool_digest,
+            digest_memo=memo,
+        )
+    except Exception as exc:
+        return {
+            "status": "error",
+            "seconds": round(time.perf_counter() - started, 6),
+            "error": str(exc),
+            "type": type(exc).__name__,
+        }
+    return {"status": "ok", "seconds": round(time.perf_counter() - started, 6)}
+
+
+def _job_from_record(record: object, base: Path, number: int) -> BatchJob:
+    if not isinstance(record, dict):
+        raise EpubMergeError(f"Job {number} must be an object")
+    unknown = sorted(set(record) - JOB_KEYS)
+    if unknown:
+        raise EpubMergeError(f"Job {number} has unknown keys: {', '.join(unknown)}")
+    output = record.get("output")
+    inputs = record.get("inputs")
+    if not isinstance(output, str) or not output:
+        raise EpubMergeError(f"Job {number} needs an output path")
+    if not isinstance(inputs, list) or not inputs or not all(isinstance(item, str) for item in inputs):
+        raise EpubMergeError(f"Job {number} needs a non-empty list of input paths")
+    return BatchJob(
+        output=_resolve(base, output),
+        inputs=tuple(_resolve(base, item) for item in inputs),
+        title=record.get("title"),
+        structure=record.get("structure", "volume"),
+        input_order=bool(record.get("input_order", False)),
+        compression=record.get("compression"),
+    )
+
+
+def _parse_line(line: str, number: int) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return InvalidJob(None, f"Job {number} is not valid JSON: {exc}")
+
+
+def _record_output(record: object, base: Path) -> Path | None:
+    output = record.get("output") if isinstance(record, dict) else None
+    return _resolve(base, output) if isinstance(output, str) and output else None
+
+
+def _resolve(base: Path, value: str) -> Path:
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else base / path
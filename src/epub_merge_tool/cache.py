@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+
+from .models import ManifestItem, SourceBook, TocEntry
+
+
+CACHE_SCHEMA = "epub-merge-tool-cache/v1"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class SourceCache:
+    """LRU cache of parsed :class:`SourceBook` metadata keyed by path, size and mtime."""
+
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.directory = Path(directory).expanduser() if directory is not None else None
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._books: OrderedDict[str, SourceBook] = OrderedDict()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, path: Path, *, digest: bool = False) -> SourceBook | None:
+        """Return the cached book for ``path``, or ``None`` on a miss."""
+        key = _identity(path)
+        if key is None:
+            return None
+        with self._lock:
+            book = self._books.get(key)
+            if book is not None:
+                self._books.move_to_end(key)
+        if book is None:
+            book = self._load(key, Path(path).expanduser())
+            if book is None:
+                return None
+            self._remember(key, book)
+        if digest and book.sha256 is None:
+            return None
+        requested = Path(path).expanduser()
+        if book.path != requested:
+            book = replace(book, path=requested, basename=requested.name)
+        return book
+
+    def put(self, source: SourceBook) -> None:
+        key = _identity(source.path)
+        if key is None:
+            return
+        self._remember(key, replace(source, item_data=None))
+        if self.directory is None:
+            return
+        payload = _payload_from_book(source)
+        payload["key"] = key
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        fd, temp = tempfile.mkstemp(dir=self.directory, prefix=".entry-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(temp, self._entry_path(key))
+        except BaseException:
+            Path(temp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def update_digest(self, source: SourceBook, sha256: str) -> None:
+        if source.sha256 is None:
+            self.put(replace(source, sha256=sha256, item_data=None))
+
+    def evict(self) -> None:
+        if self.directory is None:
+            return
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+            total += stat.st_size
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._books.clear()
+        if self.directory is None:
+            return
+        for entry in self.directory.glob("*.json"):
+            entry.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._books)
+
+    def _remember(self, key: str, book: SourceBook) -> None:
+        with self._lock:
+            self._books[key] = book
+            self._books.move_to_end(key)
+            while len(self._books) > self.max_entries:
+                self._books.popitem(last=False)
+
+    def _load(self, key: str, path: Path) -> SourceBook | None:
+        if self.directory is None:
+            return None
+        entry = self._entry_path(key)
+        try:
+            with entry.open("r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        if payload.get("schema") != CACHE_SCHEMA or payload.get("key") != key:
+            return None
+        return _book_from_payload(path, payload)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _identity(path: Path) -> str | None:
+    try:
+        resolved = Path(path).expanduser().resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return f"{resolved}\0{stat.st_size}\0{stat.st_mtime_ns}"
+
+
+def _payload_from_book(source: SourceBook) -> dict:
+    return {
+        "schema": CACHE_SCHEMA,
+        "basename": source.basename,
+        "sha256": source.sha256,
+        "opf_path": source.opf_path,
+        "opf_dir": source.opf_dir,
+        "title": source.title,
+        "language": source.language,
+        "creators": list(source.creators),
+        "manifest_items": [
+            [item.item_id, item.href, item.media_type, list(item.properties)] for item in source.manifest_items
+        ],
+        "spine_ids": list(source.spine_ids),
+        "toc": [[entry.title, entry.href] for entry in source.toc],
+    }
+
+
+def _book_from_payload(path: Path, payload: dict) -> SourceBook:
+    return SourceBook(
+        path=path,
+        basename=payload["basename"],
+        sha256=payload["sha256"],
+        opf_path=payload["opf_path"],
+        opf_dir=payload["opf_dir"],
+        title=payload["title"],
+        language=payload["language"],
+        creators=tuple(payload["creators"]),
+        manifest_items=tuple(
+            ManifestItem(item_id, href, media_type, tuple(properties))
+            for item_id, href, media_type, properties in payload["manifest_items"]
+        ),
+        spine_ids=tuple(payload["spine_ids"]),
+        toc=tuple(TocEntry(title, href) for title, href in payload["toc"]),
+    )
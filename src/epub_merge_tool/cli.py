@@ -4,31 +4,134 @@ import argparse
 import json
 import sys
 from pathlib import Path
+from typing import TextIO
 
+from .batch import load_jobs, run_batch
+from .cache import DEFAULT_MAX_BYTES, SourceCache
+from .compression import CompressionReport
 from .errors import EpubMergeError
-from .inspect import inspect_epub
-from .merge import merge_epubs
+from .inspect import expand_inspect_paths, inspect_epub, inspect_epubs
+from .merge import append_epubs, merge_epubs
+from .plan import load_plan, merge_plan, plan_merge
+from .pool import POOL_DIGESTS
+from .server import MergeServer
 from .split import split_epub
+from .stats import MergeStats
 
 
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
     try:
+        report = CompressionReport() if getattr(args, "compression_report", False) else None
+        cache = _source_cache(args)
+        stats = MergeStats() if getattr(args, "stats", None) else None
         if args.command == "merge":
-            merge_epubs(
-                args.output,
+            if (args.plan is None) == (not args.inputs):
+                parser.error("merge needs either INPUTS or --plan, not both")
+            to_stdout = str(args.output) == "-"
+            options = dict(
+                title=args.title,
+                workers=args.jobs,
+                source_digest=args.source_digest,
+                compression=args.compression,
+                compression_report=report,
+                cache=cache,
+                pool_digest=args.pool_digest,
+                memory_budget=_memory_budget(args),
+                stats=stats,
+            )
+            output = sys.stdout.buffer if to_stdout else args.output
+            if args.plan is None:
+                merge_epubs(output, args.inputs, structure=args.structure, input_order=args.input_order, **options)
+            else:
+                merge_plan(output, load_plan(args.plan), **options)
+            if to_stdout:
+                sys.stdout.buffer.flush()
+            _print_reports(report, stats, sys.stderr if to_stdout else None)
+            return 0
+        if args.command == "plan":
+            plan = plan_merge(
                 args.inputs,
                 title=args.title,
                 structure=args.structure,
                 input_order=args.input_order,
+                workers=args.jobs,
+                cache=cache,
+            )
+            text = json.dumps(plan, ensure_ascii=False, indent=2)
+            if args.output is None:
+                print(text)
+            else:
+                args.output.write_text(text + "\n", encoding="utf-8")
+            return 1 if plan["flat_title_conflicts"] else 0
+        if args.command == "append":
+            append_epubs(
+                args.merged,
+                args.inputs,
+                output_path=args.output,
+                input_order=args.input_order,
+                workers=args.jobs,
+                source_digest=args.source_digest,
+                compression=args.compression,
+                compression_report=report,
+                cache=cache,
+                pool_digest=args.pool_digest,
+                memory_budget=_memory_budget(args),
+                stats=stats,
             )
+            _print_reports(report, stats)
             return 0
+        if args.command == "batch":
+            failed = 0
+            for result in run_batch(
+                load_jobs(args.jobfile),
+                workers=args.jobs,
+                cache=cache,
+                source_digest=args.source_digest,
+                pool_digest=args.pool_digest,
+            ):
+                failed += result["status"] != "ok"
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            return 1 if failed else 0
         if args.command == "split":
-            split_epub(args.input, args.out_dir, heuristic=args.heuristic)
+            split_epub(
+                args.input,
+                args.out_dir,
+                heuristic=args.heuristic,
+                compression=args.compression,
+                compression_report=report,
+                workers=args.jobs,
+                only=args.only,
+                memory_budget=_memory_budget(args),
+                stats=stats,
+            )
+            _print_reports(report, stats)
             return 0
         if args.command == "inspect":
-            print(json.dumps(inspect_epub(args.input), ensure_ascii=False, indent=2))
+            paths = expand_inspect_paths(args.inputs)
+            if len(args.inputs) == 1 and len(paths) == 1 and paths[0] == args.inputs[0]:
+                print(json.dumps(inspect_epub(paths[0]), ensure_ascii=False, indent=2))
+                return 0
+            failed = 0
+            for result in inspect_epubs(paths, workers=args.jobs):
+                failed += result["status"] != "ok"
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            return 1 if failed else 0
+        if args.command == "serve":
+            with MergeServer(
+                workers=args.jobs,
+                cache=cache,
+                source_digest=args.source_digest,
+                pool_digest=args.pool_digest,
+            ) as server:
+                if args.socket is None:
+                    server.serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+                else:
+                    try:
+                        server.serve_unix(args.socket)
+                    except KeyboardInterrupt:
+                        pass
             return 0
     except EpubMergeError as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -45,14 +148,174 @@ def build_parser() -> argparse.ArgumentParser:
     merge.add_argument("--structure", choices=("volume", "flat"), default="volume")
     merge.add_argument("--input-order", action="store_true", help="use the explicit INPUT order instead of automatic ordering")
     merge.add_argument("--title")
-    merge.add_argument("output", type=Path)
-    merge.add_argument("inputs", nargs="+", type=Path)
+    _add_source_digest_arguments(merge)
+    merge.add_argument("--jobs", type=int, default=1, help="number of input EPUBs to parse concurrently")
+    _add_compression_arguments(merge)
+    _add_memory_arguments(merge)
+    _add_stats_arguments(merge)
+    _add_cache_arguments(merge)
+    _add_pool_arguments(merge)
+    merge.add_argument("--plan", type=Path, help="run a plan written by 'plan'; it fixes the inputs and their order")
+    merge.add_argument("output", type=Path, help="output EPUB, or '-' to stream it to stdout")
+    merge.add_argument("inputs", nargs="*", type=Path)
+
+    plan = subparsers.add_parser(
+        "plan",
+        help="print the merge plan as JSON without reading member bodies",
+    )
+    plan.add_argument("--structure", choices=("volume", "flat"), default="volume")
+    plan.add_argument("--input-order", action="store_true", help="use the explicit INPUT order instead of automatic ordering")
+    plan.add_argument("--title")
+    plan.add_argument("--jobs", type=int, default=1, help="number of input EPUBs to parse concurrently")
+    plan.add_argument("--output", type=Path, help="write the plan here instead of stdout")
+    _add_cache_arguments(plan)
+    plan.add_argument("inputs", nargs="+", type=Path)
+
+    append = subparsers.add_parser("append", help="append EPUB files to a tool-generated EPUB")
+    append.add_argument("--output", type=Path, help="write the result here instead of replacing MERGED")
+    append.add_argument(
+        "--input-order",
+        action="store_true",
+        help="keep existing volumes first and append INPUTS in order",
+    )
+    _add_source_digest_arguments(append)
+    append.add_argument("--jobs", type=int, default=1, help="number of input EPUBs to parse concurrently")
+    _add_compression_arguments(append)
+    _add_memory_arguments(append)
+    _add_stats_arguments(append)
+    _add_cache_arguments(append)
+    _add_pool_arguments(append)
+    append.add_argument("merged", type=Path)
+    append.add_argument("inputs", nargs="+", type=Path)
+
+    batch = subparsers.add_parser("batch", help="run many merge jobs from a JSON or JSONL job file")
+    _add_source_digest_arguments(batch)
+    batch.add_argument("--jobs", type=int, default=1, help="number of merge jobs to run concurrently")
+    _add_cache_arguments(batch)
+    _add_pool_arguments(batch)
+    batch.add_argument("jobfile", help="job file; '-' reads jobs from stdin")
 
     split = subparsers.add_parser("split", help="split a tool-generated EPUB")
     split.add_argument("input", type=Path)
     split.add_argument("--out-dir", required=True, type=Path)
     split.add_argument("--heuristic", action="store_true")
+    split.add_argument("--jobs", type=int, default=1, help="number of output volumes to build concurrently")
+    split.add_argument(
+        "--only",
+        action="append",
+        metavar="BASENAME",
+        help="split only the source with this basename; repeat to select several",
+    )
+    _add_compression_arguments(split)
+    _add_memory_arguments(split)
+    _add_stats_arguments(split)
 
-    inspect = subparsers.add_parser("inspect", help="inspect merge manifest")
-    inspect.add_argument("input", type=Path)
+    inspect = subparsers.add_parser(
+        "inspect",
+        help="inspect merge manifests; several files or a directory print one JSON line per EPUB",
+    )
+    inspect.add_argument("--jobs", type=int, default=1, help="number of EPUBs to inspect concurrently")
+    inspect.add_argument("inputs", nargs="+", type=Path, metavar="input")
+
+    serve = subparsers.add_parser(
+        "serve",
+        help="answer merge, split and inspect JSON-RPC requests with warm caches",
+    )
+    serve.add_argument("--socket", type=Path, help="listen on this Unix domain socket instead of stdin/stdout")
+    serve.add_argument("--jobs", type=int, default=4, help="number of requests to run concurrently")
+    _add_source_digest_arguments(serve)
+    _add_cache_arguments(serve)
+    _add_pool_arguments(serve)
     return parser
+
+
+def _add_compression_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compression",
+        default="deflate",
+        help="preset (deflate, store, auto, media) or TYPE=STRATEGY rules, e.g. media,default=auto",
+    )
+    parser.add_argument(
+        "--compression-report",
+        action="store_true",
+        help="print bytes and time saved per media type as JSON",
+    )
+
+
+def _add_memory_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        help="cap buffered member data; larger members are streamed from their source in chunks",
+    )
+
+
+def _add_stats_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--stats",
+        choices=("json",),
+        help="print wall time, counters and peak memory per phase as JSON; with --compression-report both "
+        'are printed as one object with "compression" and "stats" keys',
+    )
+
+
+def _add_source_digest_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--source-digest",
+        choices=("eager", "deferred", "skip"),
+        default="eager",
+        help="when to hash input files for the merge manifest",
+    )
+
+
+def _add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache-dir", type=Path, help="reuse parsed input metadata stored in this directory")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=_non_negative_int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="evict least recently used cache entries beyond this size",
+    )
+
+
+def _add_pool_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--pool-digest",
+        choices=POOL_DIGESTS,
+        default="sha256",
+        help="digest used to confirm duplicate images and fonts that share size and CRC-32",
+    )
+
+
+def _non_negative_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, not {text!r}") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be zero or more, not {value}")
+    return value
+
+
+def _source_cache(args: argparse.Namespace) -> SourceCache | None:
+    if getattr(args, "cache_dir", None) is None:
+        return None
+    return SourceCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+
+def _memory_budget(args: argparse.Namespace) -> int | None:
+    if args.memory_budget_mb is None:
+        return None
+    return args.memory_budget_mb * 1024 * 1024
+
+
+def _print_reports(report: CompressionReport | None, stats: MergeStats | None, file: TextIO | None = None) -> None:
+    if report is not None and stats is not None:
+        document = {"compression": report.as_dict(), "stats": stats.as_dict()}
+    elif report is not None:
+        document = report.as_dict()
+    elif stats is not None:
+        document = stats.as_dict()
+    else:
+        return
+    print(json.dumps(document, indent=2), file=file)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Mapping
+
+from .errors import EpubMergeError
+from .zip_io import RawMember, deflate_member
+
+
+AUTO_SAMPLE_SIZE = 64 * 1024
+AUTO_MIN_SAVING = 0.05
+PRECOMPRESSED_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/avif",
+    "font/woff",
+    "font/woff2",
+    "application/font-woff",
+    "audio/*",
+    "video/*",
+)
+PRESETS = {
+    "deflate": ("deflate", {}),
+    "store": ("store", {}),
+    "auto": ("auto", {}),
+    "media": ("deflate", {media_type: "store" for media_type in PRECOMPRESSED_TYPES}),
+}
+
+
+@dataclass(frozen=True)
+class Strategy:
+    method: str
+    level: int = zlib.Z_DEFAULT_COMPRESSION
+
+    @classmethod
+    def parse(cls, text: str) -> Strategy:
+        method, _, level = text.strip().lower().partition(":")
+        if method not in {"store", "deflate", "auto"}:
+            raise EpubMergeError(f"unknown compression strategy {text!r}")
+        if not level:
+            return cls(method)
+        if method == "store" or not level.isdigit() or not 0 <= int(level) <= 9:
+            raise EpubMergeError(f"invalid compression level in {text!r}")
+        return cls(method, int(level))
+
+
+class CompressionPolicy:
+    """Choose how each member the tool encodes is stored, by media type."""
+
+    def __init__(self, default: str = "deflate", rules: Mapping[str, str] | None = None) -> None:
+        self.default = Strategy.parse(default)
+        self.rules = {media_type.lower(): Strategy.parse(text) for media_type, text in (rules or {}).items()}
+
+    @classmethod
+    def parse(cls, spec: str) -> CompressionPolicy:
+        """Build a policy from comma-separated presets and ``TYPE=STRATEGY`` rules."""
+        default = "deflate"
+        rules: dict[str, str] = {}
+        for part in spec.split(","):
+            key, sep, value = part.partition("=")
+            key = key.strip().lower()
+            if not sep and key in PRESETS:
+                default, preset_rules = PRESETS[key]
+                rules.update(preset_rules)
+            elif not sep:
+                raise EpubMergeError(f"invalid compression rule {part!r}; expected TYPE=STRATEGY")
+            elif key == "default":
+                default = value
+            else:
+                rules[key] = value
+        return cls(default, rules)
+
+    def strategy_for(self, media_type: str) -> Strategy:
+        normalized = media_type.lower()
+        strategy = self.rules.get(normalized)
+        if strategy is None:
+            strategy = self.rules.get(f"{normalized.partition('/')[0]}/*", self.default)
+        return strategy
+
+    def stores(self, media_type: str) -> bool:
+        return self.strategy_for(media_type).method == "store"
+
+    def encode(self, data: bytes, media_type: str, report: CompressionReport | None = None) -> RawMember:
+        strategy = self.strategy_for(media_type)
+        started = time.perf_counter()
+        saved_seconds = 0.0
+        method = strategy.method
+        compressed: bytes | None = None
+        if method == "auto":
+            sample = data[:AUTO_SAMPLE_SIZE]
+            deflated_sample = deflate_member(sample, strategy.level).data
+            sample_seconds = time.perf_counter() - started
+            if len(deflated_sample) > len(sample) * (1 - AUTO_MIN_SAVING):
+                method = "store"
+                if sample:
+                    saved_seconds = sample_seconds * (len(data) - len(sample)) / len(sample)
+            else:
+                method = "deflate"
+                if len(sample) == len(data):
+                    compressed = deflated_sample
+        if method == "store":
+            member = RawMember(zipfile.ZIP_STORED, zlib.crc32(data), len(data), data)
+        elif compressed is None:
+            member = deflate_member(data, strategy.level)
+        else:
+            member = RawMember(zipfile.ZIP_DEFLATED, zlib.crc32(data), len(data), compressed)
+        if report is not None:
+            report.record(media_type, method, len(data), len(member.data), time.perf_counter() - started, saved_seconds)
+        return member
+
+
+class CompressionReport:
+    """Thread-safe per-media-type totals for the encoding choices a policy made."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: dict[tuple[str, str], dict[str, float]] = {}
+
+    def record(
+        self,
+        media_type: str,
+        method: str,
+        bytes_in: int,
+        bytes_out: int,
+        seconds: float,
+        seconds_saved: float = 0.0,
+    ) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(
+                (media_type.lower(), method),
+                {"members": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0, "seconds_saved": 0.0},
+            )
+            totals["members"] += 1
+            totals["bytes_in"] += bytes_in
+            totals["bytes_out"] += bytes_out
+            totals["seconds"] += seconds
+            totals["seconds_saved"] += seconds_saved
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            entries = [
+                {
+                    "media_type": media_type,
+                    "method": method,
+                    "members": int(totals["members"]),
+                    "bytes_in": int(totals["bytes_in"]),
+                    "bytes_out": int(totals["bytes_out"]),
+                    "bytes_saved": int(totals["bytes_in"] - totals["bytes_out"]),
+                    "seconds": round(totals["seconds"], 6),
+                    "seconds_saved": round(totals["seconds_saved"], 6),
+                }
+                for (media_type, method), totals in sorted(self._totals.items())
+            ]
+        return {
+            "entries": entries,
+            "bytes_in": sum(entry["bytes_in"] for entry in entries),
+            "bytes_out": sum(entry["bytes_out"] for entry in entries),
+            "seconds": round(sum(entry["seconds"] for entry in entries), 6),
+            "seconds_saved": round(sum(entry["seconds_saved"] for entry in entries), 6),
+        }
+
+
+def resolve_policy(compression: CompressionPolicy | str | None) -> CompressionPolicy:
+    if compression is None:
+        return CompressionPolicy()
+    if isinstance(compression, str):
+        return CompressionPolicy.parse(compression)
+    return compression
+
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import mimetypes
+import mmap
 import posixpath
+import time
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path, PurePosixPath
-from typing import Iterable
+from typing import Iterable, Iterator
 import xml.etree.ElementTree as ET
 
+from .cache import SourceCache
 from .errors import InvalidEpubError, ManifestError
 from .models import ManifestItem, SourceBook, TocEntry
+from .progress import Progress, _NullProgress, resolve_progress
+from .stats import MergeStats, resolve_stats
+from .zip_io import (
+    COPY_CHUNK_SIZE,
+    RawMember,
+    can_copy_raw,
+    copy_raw_member,
+    deflate_member,
+    read_raw_member,
+    stream_member,
+    write_raw_member,
+)
 
 
 OPF_NS = "http://www.idpf.org/2007/opf"
@@ -18,6 +36,7 @@ CONTAINER_NS = "urn:oasis:names:tc:opendocument:xmlns:container"
 XHTML_NS = "http://www.w3.org/1999/xhtml"
 EPUB_MIMETYPE = "application/epub+zip"
 MERGE_MANIFEST_PATH = "META-INF/epub-merge-tool.json"
+MERGE_SUMMARY_PATH = "META-INF/epub-merge-summary.json"
 NS = {"opf": OPF_NS, "dc": DC_NS, "c": CONTAINER_NS, "xhtml": XHTML_NS}
 
 ET.register_namespace("", OPF_NS)
@@ -41,13 +60,74 @@ def sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
-def read_source_book(path: Path) -> SourceBook:
+class MappedArchive:
+    """A zip archive read through a memory map of the whole file."""
+
+    def __init__(self, path: Path, *, mapped: bool = True) -> None:
+        self.path = path
+        self._fh = path.open("rb")
+        self._map: mmap.mmap | None = None
+        if not mapped:
+            try:
+                self.zf = zipfile.ZipFile(self._fh, "r")
+            except BaseException:
+                self._fh.close()
+                raise
+            return
+        try:
+            self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            self._fh.close()
+            raise zipfile.BadZipFile("empty file") from exc
+        try:
+            self.zf = zipfile.ZipFile(_MappedFile(self._map), "r")
+        except BaseException:
+            self._map.close()
+            self._fh.close()
+            raise
+
+    def __enter__(self) -> MappedArchive:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def sha256(self) -> str:
+        if self._map is None:
+            return sha256_file(self.path)
+        return hashlib.sha256(self._map).hexdigest()
+
+    def close(self) -> None:
+        self.zf.close()
+        if self._map is not None:
+            self._map.close()
+        self._fh.close()
+
+
+def read_source_book(
+    path: Path,
+    *,
+    lazy: bool = False,
+    digest: bool = True,
+    cache: SourceCache | None = None,
+    stats: MergeStats | None = None,
+) -> SourceBook:
+    """Parse an input EPUB."""
+    stats = resolve_stats(stats)
+    started = time.perf_counter() if stats.enabled else 0.0
     path = Path(path).expanduser()
     if not path.exists():
         raise InvalidEpubError(f"Input file not found: {path}")
     basename = safe_basename(path)
+    if cache is not None and lazy:
+        cached = cache.get(path, digest=digest)
+        if cached is not None:
+            if stats.enabled:
+                stats.add("parse", time.perf_counter() - started, books=1, cache_hits=1)
+            return cached
     try:
-        with zipfile.ZipFile(path, "r") as zf:
+        with MappedArchive(path) as archive:
+            zf = archive.zf
             opf_path = _read_opf_path(zf)
             opf_dir = str(PurePosixPath(opf_path).parent)
             if opf_dir == ".":
@@ -63,7 +143,8 @@ def read_source_book(path: Path) -> SourceBook:
             )
 
             items: list[ManifestItem] = []
-            item_data: dict[str, bytes] = {}
+            item_data: dict[str, bytes] | None = None if lazy else {}
+            member_names = set(zf.namelist()) if lazy else None
             id_to_item: dict[str, ManifestItem] = {}
             for idx, node in enumerate(manifest.findall("opf:item", NS)):
                 item_id = node.get("id") or f"item{idx}"
@@ -75,7 +156,12 @@ def read_source_book(path: Path) -> SourceBook:
                 item = ManifestItem(item_id, href, media_type, properties)
                 items.append(item)
                 id_to_item[item_id] = item
-                item_data[href] = _read_member(zf, _join_opf(opf_dir, href), basename)
+                member = _join_opf(opf_dir, href)
+                if item_data is None:
+                    if member not in member_names:
+                        raise InvalidEpubError(f"{basename}: missing zip member {member!r}")
+                else:
+                    item_data[href] = _read_member(zf, member, basename)
 
             spine_ids: list[str] = []
             for node in spine.findall("opf:itemref", NS):
@@ -87,13 +173,20 @@ def read_source_book(path: Path) -> SourceBook:
                 raise InvalidEpubError(f"{basename}: spine is empty")
 
             toc = _read_toc(zf, opf_dir, items, spine_ids, id_to_item, spine, basename)
+            if stats.enabled:
+                size = path.stat().st_size
+                parsed = time.perf_counter()
+                stats.add("parse", parsed - started, books=1, members=len(items), bytes_in=size)
+            sha256 = archive.sha256() if digest else None
+            if stats.enabled and digest:
+                stats.add("hash_sources", time.perf_counter() - parsed, books=1, bytes_in=size)
     except zipfile.BadZipFile as exc:
         raise InvalidEpubError(f"Invalid EPUB zip: {path}") from exc
 
-    return SourceBook(
+    book = SourceBook(
         path=path,
         basename=basename,
-        sha256=sha256_file(path),
+        sha256=sha256,
         opf_path=opf_path,
         opf_dir=opf_dir,
         title=title,
@@ -104,24 +197,178 @@ def read_source_book(path: Path) -> SourceBook:
         toc=tuple(toc),
         item_data=item_data,
     )
+    if cache is not None and lazy:
+        cache.put(book)
+    return book
+
+
+def read_source_books(
+    paths: Iterable[Path | str],
+    *,
+    lazy: bool = False,
+    digest: bool = True,
+    workers: int = 1,
+    cache: SourceCache | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> list[SourceBook]:
+    """Parse several inputs, optionally on a thread pool, keeping the input order."""
+    paths = [Path(path) for path in paths]
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    progress = resolve_progress(progress)
+    if workers == 1 or len(paths) <= 1:
+        books = []
+        for path in paths:
+            books.append(read_source_book(path, lazy=lazy, digest=digest, cache=cache, stats=stats))
+            _report_parsed(progress, books[-1])
+        return books
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = [
+            executor.submit(read_source_book, path, lazy=lazy, digest=digest, cache=cache, stats=stats)
+            for path in paths
+        ]
+        try:
+            for future in as_completed(futures):
+                _report_parsed(progress, future.result())
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+class SourceReader:
+    """Read manifest members of a :class:`SourceBook` one at a time."""
+
+    def __init__(self, source: SourceBook, *, mapped: bool = True) -> None:
+        self.source = source
+        self.mapped = mapped
+        self._archive: MappedArchive | None = None
+        self._zf: zipfile.ZipFile | None = None
+
+    def __enter__(self) -> SourceReader:
+        if self.source.item_data is None:
+            try:
+                self._archive = MappedArchive(self.source.path, mapped=self.mapped)
+            except (OSError, zipfile.BadZipFile) as exc:
+                raise InvalidEpubError(f"Invalid EPUB zip: {self.source.path}") from exc
+            self._zf = self._archive.zf
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+            self._zf = None
+
+    def sha256(self) -> str:
+        """Return the source digest, hashing the open archive if parsing deferred it."""
+        if self.source.sha256 is not None:
+            return self.source.sha256
+        if self._archive is not None:
+            return self._archive.sha256()
+        return sha256_file(self.source.path)
+
+    def read(self, href: str) -> bytes:
+        if self.source.item_data is not None:
+            return self.source.item_data[href]
+        if self._zf is None:
+            raise InvalidEpubError(f"{self.source.basename}: source reader is not open")
+        return _read_member(self._zf, _join_opf(self.source.opf_dir, href), self.source.basename)
+
+    def location(self, href: str) -> tuple[Path, str]:
+        return self.source.path, _join_opf(self.source.opf_dir, href)
+
+    def size_and_crc(self, href: str) -> tuple[int, int]:
+        """Return the member's uncompressed size and CRC-32 without inflating it."""
+        if self._zf is None:
+            data = self.read(href)
+            return len(data), zlib.crc32(data)
+        info = self.info(href)
+        return info.file_size, info.CRC
+
+    def member_size(self, href: str) -> int | None:
+        """Return the larger of the member's stored and uncompressed sizes, or ``None`` for an eager book."""
+        if self._zf is None:
+            return None
+        info = self.info(href)
+        return max(info.compress_size, info.file_size)
+
+    def read_raw(self, href: str) -> RawMember | None:
+        """Return the member's compressed stream, or ``None`` if it must be re-encoded."""
+        if self._zf is None:
+            return None
+        return read_raw_member(self._zf, self.info(href))
+
+    def iter_chunks(self, href: str) -> Iterator[bytes]:
+        """Yield the member's uncompressed bytes in bounded chunks."""
+        if self._zf is None:
+            yield self.read(href)
+            return
+        with self._zf.open(self.info(href)) as member:
+            while chunk := member.read(COPY_CHUNK_SIZE):
+                yield chunk
+
+    def copy_to(self, out: zipfile.ZipFile, href: str, arcname: str, compress_type: int = zipfile.ZIP_DEFLATED) -> None:
+        """Write the member to ``out`` in chunks, raw unless it must be re-encoded or stored."""
+        if self._zf is None:
+            raise InvalidEpubError(f"{self.source.basename}: source reader is not open")
+        info = self.info(href)
+        if can_copy_raw(info) and (compress_type != zipfile.ZIP_STORED or info.compress_type == zipfile.ZIP_STORED):
+            copy_raw_member(self._zf, info, out, arcname)
+        else:
+            stream_member(self._zf, info, out, arcname, compress_type)
+
+    def info(self, href: str) -> zipfile.ZipInfo:
+        """Return the zip entry of a manifest member of a lazy book."""
+        if self._zf is None:
+            raise InvalidEpubError(f"{self.source.basename}: source reader is not open")
+        name = _join_opf(self.source.opf_dir, href)
+        try:
+            return self._zf.getinfo(name)
+        except KeyError as exc:
+            raise InvalidEpubError(f"{self.source.basename}: missing zip member {name!r}") from exc
+
+
+class _MappedFile(io.RawIOBase):
+    def __init__(self, mapped: mmap.mmap) -> None:
+        self._map = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._map.tell()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._map.seek(offset, whence)
+        return self._map.tell()
+
+    def read(self, size: int | None = -1) -> bytes:
+        return self._map.read(size if size is not None and size >= 0 else None)
 
 
 def write_epub_container(zf: zipfile.ZipFile, opf_path: str = "OEBPS/content.opf") -> None:
-    zf.writestr(
-        "META-INF/container.xml",
-        f"""<?xml version="1.0"?>
+    container = f"""<?xml version="1.0"?>
 <container version="1.0" xmlns="{CONTAINER_NS}">
   <rootfiles>
     <rootfile full-path="{opf_path}" media-type="application/oebps-package+xml"/>
   </rootfiles>
 </container>
-""",
-        compress_type=zipfile.ZIP_DEFLATED,
-    )
+"""
+    write_raw_member(zf, "META-INF/container.xml", deflate_member(container.encode("utf-8")))
 
 
 def write_mimetype_first(zf: zipfile.ZipFile) -> None:
-    zf.writestr("mimetype", EPUB_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+    data = EPUB_MIMETYPE.encode("ascii")
+    write_raw_member(zf, "mimetype", RawMember(zipfile.ZIP_STORED, zlib.crc32(data), len(data), data))
 
 
 def build_nav_html(book_title: str, book_href: str, children: Iterable[tuple[str, str, list[TocEntry]]]) -> bytes:
@@ -211,6 +458,23 @@ def require_manifest(data: bytes) -> dict:
     return manifest
 
 
+def read_package_items(data: bytes, label: str) -> list[ManifestItem]:
+    root = _parse_xml(data, label)
+    manifest = _required(root.find("opf:manifest", NS), f"{label}: missing manifest")
+    items: list[ManifestItem] = []
+    for idx, node in enumerate(manifest.findall("opf:item", NS)):
+        href = _required_attr(node, "href", f"{label}: manifest item missing href")
+        media_type = node.get("media-type") or mimetypes.guess_type(href)[0] or "application/octet-stream"
+        properties = tuple((node.get("properties") or "").split())
+        items.append(ManifestItem(node.get("id") or f"item{idx}", href, media_type, properties))
+    return items
+
+
+def _report_parsed(progress: Progress | _NullProgress, book: SourceBook) -> None:
+    progress.check()
+    progress.source_parsed(book.basename, len(book.manifest_items))
+
+
 def _read_opf_path(zf: zipfile.ZipFile) -> str:
     try:
         root = _parse_xml(zf.read("META-INF/container.xml"), "META-INF/container.xml")
@@ -233,12 +497,10 @@ def _read_toc(
 ) -> list[TocEntry]:
     nav_item = next((item for item in items if "nav" in item.properties), None)
     if nav_item is not None:
-        nav_data = _read_member(zf, _join_opf(opf_dir, nav_item.href), basename)
-        return _parse_nav(nav_data, basename)
+        return _parse_nav(_iter_member(zf, _join_opf(opf_dir, nav_item.href), basename), basename)
     ncx_item = _find_ncx_item(items, spine_node)
     if ncx_item is not None:
-        ncx_data = _read_member(zf, _join_opf(opf_dir, ncx_item.href), basename)
-        return _parse_ncx(ncx_data, basename)
+        return _parse_ncx(_iter_member(zf, _join_opf(opf_dir, ncx_item.href), basename), basename)
     toc: list[TocEntry] = []
     for index, item_id in enumerate(spine_ids, start=1):
         item = id_to_item[item_id]
@@ -259,55 +521,136 @@ def _find_ncx_item(items: list[ManifestItem], spine_node: ET.Element) -> Manifes
     return None
 
 
-def _parse_nav(data: bytes, basename: str) -> list[TocEntry]:
-    root = _parse_xml(data, f"{basename}:nav")
-    toc_node = None
-    for node in root.iter():
-        if _local_name(node.tag) == "nav" and "toc" in (node.get(f"{{http://www.idpf.org/2007/ops}}type") or node.get("epub:type") or node.get("type") or ""):
-            toc_node = node
-            break
-    if toc_node is None:
-        for node in root.iter():
-            if _local_name(node.tag) == "nav":
-                toc_node = node
-                break
-    if toc_node is None:
+def _parse_nav(chunks: Iterable[bytes], basename: str) -> list[TocEntry]:
+    target = _NavTarget()
+    _feed_xml(chunks, target, f"{basename}:nav")
+    entries = target.toc if target.toc is not None else target.fallback
+    if entries is None:
         raise InvalidEpubError(f"{basename}: nav file has no nav element")
-    entries = []
-    for node in toc_node.iter():
-        if _local_name(node.tag) == "a":
-            href = node.get("href")
-            title = "".join(node.itertext()).strip()
-            if href and title:
-                entries.append(TocEntry(title, href))
     if not entries:
         raise InvalidEpubError(f"{basename}: nav file has no TOC links")
     return entries
 
 
-def _parse_ncx(data: bytes, basename: str) -> list[TocEntry]:
-    root = _parse_xml(data, f"{basename}:toc.ncx")
-    entries: list[TocEntry] = []
-    for node in root.iter():
-        if _local_name(node.tag) != "navPoint":
-            continue
-        title = ""
-        href = ""
-        for child in node.iter():
-            if _local_name(child.tag) == "text" and child.text:
-                title = child.text.strip()
-                break
-        for child in node.iter():
-            if _local_name(child.tag) == "content" and child.get("src"):
-                href = child.get("src") or ""
-                break
-        if title and href:
-            entries.append(TocEntry(title, href))
+def _parse_ncx(chunks: Iterable[bytes], basename: str) -> list[TocEntry]:
+    target = _NcxTarget()
+    _feed_xml(chunks, target, f"{basename}:toc.ncx")
+    entries = [TocEntry(title, href) for title, href in target.points if title and href]
     if not entries:
         raise InvalidEpubError(f"{basename}: toc.ncx has no navPoint entries")
     return entries
 
 
+class _NavTarget:
+    """Parser target collecting the links of a nav document in one pass."""
+
+    def __init__(self) -> None:
+        self.toc: list[TocEntry] | None = None
+        self.fallback: list[TocEntry] | None = None
+        self._depth = 0
+        self._open: list[tuple[int, list[TocEntry]]] = []
+        self._link: tuple[str | None, list[str], int] | None = None
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        self._depth += 1
+        name = _local_name(tag)
+        if name == "nav":
+            nav_type = attrib.get("{http://www.idpf.org/2007/ops}type") or attrib.get("epub:type") or attrib.get("type") or ""
+            if self.fallback is None:
+                self.fallback = []
+                self._open.append((self._depth, self.fallback))
+                if "toc" in nav_type:
+                    self.toc = self.fallback
+            elif self.toc is None and "toc" in nav_type:
+                self.toc = []
+                self._open.append((self._depth, self.toc))
+        elif name == "a" and self._open and self._link is None:
+            self._link = (attrib.get("href"), [], self._depth)
+
+    def data(self, text: str) -> None:
+        if self._link is not None:
+            self._link[1].append(text)
+
+    def end(self, tag: str) -> None:
+        if self._link is not None and self._link[2] == self._depth:
+            href, parts, _ = self._link
+            self._link = None
+            title = "".join(parts).strip()
+            if href and title:
+                for _, entries in self._open:
+                    entries.append(TocEntry(title, href))
+        while self._open and self._open[-1][0] == self._depth:
+            self._open.pop()
+        self._depth -= 1
+
+    def close(self) -> None:
+        return None
+
+
+class _NcxTarget:
+    """Parser target collecting ``(title, href)`` per navPoint in document order."""
+
+    def __init__(self) -> None:
+        self.points: list[list[str | None]] = []
+        self._stack: list[list[str | None]] = []
+        self._depth = 0
+        self._text: list[str] | None = None
+        self._text_depth = 0
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        self._depth += 1
+        name = _local_name(tag)
+        if name == "navPoint":
+            point: list[str | None] = [None, None]
+            self.points.append(point)
+            self._stack.append(point)
+            self._text = None
+        elif not self._stack:
+            return
+        elif name == "text" and self._text is None and self._stack[-1][0] is None:
+            self._text = []
+            self._text_depth = self._depth
+        elif name == "content" and not self._stack[-1][1]:
+            self._stack[-1][1] = attrib.get("src") or None
+
+    def data(self, text: str) -> None:
+        if self._text is not None and self._depth == self._text_depth:
+            self._text.append(text)
+
+    def end(self, tag: str) -> None:
+        if self._text is not None and self._depth == self._text_depth:
+            text = "".join(self._text)
+            self._text = None
+            if text:
+                self._stack[-1][0] = text.strip()
+        elif _local_name(tag) == "navPoint" and self._stack:
+            self._stack.pop()
+        self._depth -= 1
+
+    def close(self) -> None:
+        return None
+
+
+def _feed_xml(chunks: Iterable[bytes], target: object, label: str) -> None:
+    parser = ET.XMLParser(target=target)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+    except ET.ParseError as exc:
+        raise InvalidEpubError(f"invalid XML in {label}") from exc
+
+
+def _iter_member(zf: zipfile.ZipFile, name: str, basename: str) -> Iterator[bytes]:
+    try:
+        stream = zf.open(name)
+    except KeyError as exc:
+        raise InvalidEpubError(f"{basename}: missing zip member {name!r}") from exc
+    with stream:
+        while chunk := stream.read(COPY_CHUNK_SIZE):
+            yield chunk
+
+
 def _read_member(zf: zipfile.ZipFile, name: str, basename: str) -> bytes:
     try:
         return zf.read(name)
@@ -12,3 +12,7 @@ class OrderingError(EpubMergeError):
 
 class ManifestError(EpubMergeError):
     """Raised when a reversible merge manifest is missing or invalid."""
+
+
+class CancellationError(EpubMergeError):
+    """Raised when a merge, append or split is cancelled before it finishes."""
@@ -1,22 +1,103 @@
 from __future__ import annotations
 
+import json
+import time
 import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterable, Iterator, Mapping
 
-from .epub_io import MERGE_MANIFEST_PATH, require_manifest
-from .errors import ManifestError
+from .epub_io import MERGE_MANIFEST_PATH, MERGE_SUMMARY_PATH, require_manifest
+from .errors import EpubMergeError, ManifestError
 
 
 def inspect_epub(path: Path | str) -> dict:
+    """Describe a tool-generated EPUB."""
     with zipfile.ZipFile(Path(path).expanduser(), "r") as zf:
-        try:
-            manifest = require_manifest(zf.read(MERGE_MANIFEST_PATH))
-        except KeyError as exc:
-            raise ManifestError("missing epub-merge-tool manifest") from exc
+        infos = zf.infolist()
+        summary = _read_summary(zf)
+        if summary is None:
+            try:
+                manifest = require_manifest(zf.read(MERGE_MANIFEST_PATH))
+            except KeyError as exc:
+                raise ManifestError("missing epub-merge-tool manifest") from exc
+            sizes = {info.filename.removeprefix("OEBPS/"): info.file_size for info in infos}
+            summary = summarize_manifest(manifest, sizes)
     return {
         "tool_generated": True,
+        "schema": summary["schema"],
+        "structure": summary["structure"],
+        "title": summary["title"],
+        "sources": summary["sources"],
+        "members": len(infos),
+        "compressed_bytes": sum(info.compress_size for info in infos),
+        "uncompressed_bytes": sum(info.file_size for info in infos),
+        "pool": summary["pool"],
+    }
+
+
+def inspect_epubs(paths: Iterable[Path | str], *, workers: int = 1) -> Iterator[dict]:
+    """Inspect several EPUBs on a thread pool, yielding results as they finish."""
+    if workers < 1:
+        raise EpubMergeError("workers must be at least 1")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_inspect_one, Path(path).expanduser()): path for path in paths}
+        for future in as_completed(futures):
+            yield {"path": str(futures[future]), **future.result()}
+
+
+def summarize_manifest(manifest: dict, sizes: Mapping[str, int]) -> dict:
+    """Build the summary stored next to the merge manifest."""
+    references = Counter(
+        file_record["merged_href"] for source in manifest["sources"] for file_record in source["files"]
+    )
+    shared = {href: count for href, count in references.items() if count > 1}
+    return {
         "schema": manifest["schema"],
+        "tool_version": manifest.get("tool_version"),
         "structure": manifest["structure"],
         "title": manifest["title"],
+        "language": manifest.get("language"),
         "sources": [source["basename"] for source in manifest["sources"]],
+        "pool": {
+            "shared_resources": len(shared),
+            "references_saved": sum(count - 1 for count in shared.values()),
+            "bytes_saved": sum((count - 1) * sizes.get(href, 0) for href, count in shared.items()),
+        },
     }
+
+
+def expand_inspect_paths(paths: Iterable[Path | str]) -> list[Path]:
+    expanded: list[Path] = []
+    for path in paths:
+        path = Path(path).expanduser()
+        if path.is_dir():
+            expanded.extend(sorted(child for child in path.iterdir() if child.suffix.lower() == ".epub"))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def _inspect_one(path: Path) -> dict:
+    started = time.perf_counter()
+    try:
+        result = inspect_epub(path)
+    except (EpubMergeError, OSError, zipfile.BadZipFile) as exc:
+        return {
+            "status": "error",
+            "seconds": round(time.perf_counter() - started, 6),
+            "error": str(exc),
+            "type": type(exc).__name__,
+        }
+    return {"status": "ok", "seconds": round(time.perf_counter() - started, 6), **result}
+
+
+def _read_summary(zf: zipfile.ZipFile) -> dict | None:
+    try:
+        summary = json.loads(zf.read(MERGE_SUMMARY_PATH))
+    except (KeyError, ValueError):
+        return None
+    if not isinstance(summary, dict) or summary.get("schema") != "epub-merge-tool/v1":
+        return None
+    return summary
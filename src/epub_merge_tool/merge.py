@@ -1,191 +1,596 @@
 from __future__ import annotations
 
-import hashlib
+import functools
 import json
+import os
 import posixpath
+import tempfile
+import time
 import zipfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Mapping
 
 from . import __version__
+from .cache import SourceCache
+from .compression import CompressionPolicy, CompressionReport, resolve_policy
 from .epub_io import (
     MERGE_MANIFEST_PATH,
+    MERGE_SUMMARY_PATH,
     build_flat_nav_html,
     build_nav_html,
     build_opf,
-    read_source_book,
-    safe_basename,
+    SourceReader,
+    read_package_items,
+    read_source_books,
+    require_manifest,
     write_epub_container,
     write_mimetype_first,
 )
-from .errors import EpubMergeError
+from .errors import EpubMergeError, ManifestError
+from .inspect import summarize_manifest
 from .models import ManifestItem, SourceBook, TocEntry
-from .ordering import sort_sources
-
-
-IMAGE_OR_FONT_TYPES = {
-    "font/ttf",
-    "font/otf",
-    "font/woff",
-    "font/woff2",
-    "application/font-sfnt",
-    "application/font-woff",
-    "application/vnd.ms-opentype",
-    "application/x-font-ttf",
-    "application/x-font-opentype",
-    "application/x-font-truetype",
+from .ordering import sort_inputs
+from .pool import POOL_DIGESTS, DigestMemo, ResourcePool, can_pool
+from .progress import Progress, resolve_progress
+from .rewrite import iter_ref_values, rewrite_refs
+from .stats import MergeStats, _NullStats, resolve_stats
+from .zip_io import PipelinedZipWriter, RawMember, copy_raw_member, large_member_threshold, read_raw_member
+
+
+SOURCE_DIGEST_MODES = {"eager", "deferred", "skip"}
+REGENERATED_MEMBERS = {
+    "mimetype",
+    "META-INF/container.xml",
+    "OEBPS/content.opf",
+    "OEBPS/nav-merged.xhtml",
+    MERGE_MANIFEST_PATH,
+    MERGE_SUMMARY_PATH,
 }
 
 
 def merge_epubs(
-    output_path: Path | str,
+    output_path: Path | str | BinaryIO,
     input_paths: list[Path | str],
     *,
     title: str | None = None,
     structure: str = "volume",
     input_order: bool = False,
-) -> Path:
+    workers: int = 1,
+    source_digest: str = "eager",
+    compression: CompressionPolicy | str | None = None,
+    compression_report: CompressionReport | None = None,
+    cache: SourceCache | None = None,
+    pool_digest: str = "sha256",
+    digest_memo: DigestMemo | None = None,
+    memory_budget: int | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> Path | BinaryIO:
+    """Merge ``input_paths`` into one EPUB written to ``output_path``."""
     if structure not in {"volume", "flat"}:
         raise EpubMergeError("structure must be 'volume' or 'flat'")
     if not input_paths:
         raise EpubMergeError("At least one input EPUB is required")
+    _check_options(workers, source_digest, pool_digest, memory_budget)
+    sources = read_inputs(
+        input_paths,
+        input_order=input_order,
+        workers=workers,
+        digest=source_digest == "eager",
+        cache=cache,
+        stats=stats,
+        progress=progress,
+    )
+    return merge_sources(
+        output_path,
+        sources,
+        title=title,
+        structure=structure,
+        workers=workers,
+        source_digest=source_digest,
+        compression=compression,
+        compression_report=compression_report,
+        cache=cache,
+        pool_digest=pool_digest,
+        digest_memo=digest_memo,
+        memory_budget=memory_budget,
+        stats=stats,
+        progress=progress,
+    )
 
-    sources = [read_source_book(Path(path)) for path in input_paths]
-    _reject_duplicate_basenames(sources)
-    if not input_order:
-        sources = sort_sources(sources)
+
+def read_inputs(
+    input_paths: list[Path | str],
+    *,
+    input_order: bool = False,
+    workers: int = 1,
+    digest: bool = True,
+    cache: SourceCache | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> list[SourceBook]:
+    """Parse ``input_paths`` lazily and in merge order, as :func:`merge_epubs` does."""
+    stats = resolve_stats(stats)
+    read = functools.partial(
+        read_source_books, lazy=True, digest=digest, workers=workers, cache=cache, stats=stats, progress=progress
+    )
+    return _read_sources([Path(path).expanduser() for path in input_paths], read, input_order, stats)
+
+
+def merge_sources(
+    output_path: Path | str | BinaryIO,
+    sources: list[SourceBook],
+    *,
+    title: str | None = None,
+    structure: str = "volume",
+    planned_hrefs: Mapping[tuple[str, str], str] | None = None,
+    workers: int = 1,
+    source_digest: str = "eager",
+    compression: CompressionPolicy | str | None = None,
+    compression_report: CompressionReport | None = None,
+    cache: SourceCache | None = None,
+    pool_digest: str = "sha256",
+    digest_memo: DigestMemo | None = None,
+    memory_budget: int | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> Path | BinaryIO:
+    """Merge already parsed ``sources`` in the given order, optionally checking hrefs against a plan."""
+    if structure not in {"volume", "flat"}:
+        raise EpubMergeError("structure must be 'volume' or 'flat'")
+    if not sources:
+        raise EpubMergeError("At least one input EPUB is required")
+    _check_options(workers, source_digest, pool_digest, memory_budget)
+    policy = resolve_policy(compression)
+    stats = resolve_stats(stats)
+    progress = resolve_progress(progress)
+    encode = _instrument_encode(functools.partial(policy.encode, report=compression_report), stats)
+    progress.check()
     if structure == "flat":
         _reject_duplicate_flat_titles(sources)
+    state = _MergeState(
+        cache, ResourcePool(pool_digest, digest_memo), policy, memory_budget, stats, progress, planned_hrefs
+    )
 
-    output = Path(output_path).expanduser()
-    output.parent.mkdir(parents=True, exist_ok=True)
-    book_title = title or output.stem
+    if isinstance(output_path, (str, os.PathLike)):
+        output = Path(output_path).expanduser()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        book_title = title or output.stem
+    else:
+        output = output_path
+        book_title = title or "Merged"
     language = sources[0].language if sources else "en"
 
-    manifest_items: list[ManifestItem] = []
-    spine_ids: list[str] = []
-    manifest_sources: list[dict] = []
-    resource_pool: dict[tuple[str, str], str] = {}
-    manifest_href_ids: dict[str, str] = {}
-    zip_written: set[str] = set()
-    source_tocs: list[tuple[str, str, list[TocEntry]]] = []
-    flat_toc: list[TocEntry] = []
-    first_href = "#"
-
-    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as out:
-        write_mimetype_first(out)
-        write_epub_container(out)
-
-        for source_index, source in enumerate(sources):
-            prefix = "" if source_index == 0 else f"v{source_index}/"
-            href_map: dict[str, str] = {}
-            id_map: dict[str, str] = {}
-            file_records: list[dict] = []
-            rewrites: dict[str, dict[str, str]] = {}
-
-            for item in source.manifest_items:
-                if "nav" in item.properties:
-                    continue
-                data = source.item_data[item.href]
-                preferred_href = f"{prefix}{item.href}"
-                output_href = preferred_href
-                if _can_pool(item.media_type):
-                    digest = hashlib.sha256(data).hexdigest()
-                    output_href = resource_pool.setdefault((item.media_type.lower(), digest), preferred_href)
-                href_map[item.href] = output_href
-                new_id = f"s{source_index}_{item.item_id}"
-                owner_id = manifest_href_ids.get(output_href)
-                if owner_id is None:
-                    manifest_href_ids[output_href] = new_id
-                    owner_id = new_id
-                    manifest_items.append(
-                        ManifestItem(
-                            item_id=new_id,
-                            href=output_href,
-                            media_type=item.media_type,
-                            properties=tuple(prop for prop in item.properties if prop != "nav"),
+    try:
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as out:
+            write_mimetype_first(out)
+            write_epub_container(out)
+            with state.pipelined_writer(out, workers, encode) as writer:
+                merged = []
+                for source_index, source in enumerate(sources):
+                    with stats.phase("source") as phase:
+                        merged.append(_merge_source(state, source, source_index, writer, source_digest))
+                        phase.add(books=1, members=len(source.manifest_items))
+                    progress.emit("source_merged", source=source.basename, index=source_index, total=len(sources))
+                with stats.phase("book_files"):
+                    _write_book_files(writer, state, structure, book_title, language, merged)
+                with stats.phase("drain"):
+                    writer.close()
+    except BaseException:
+        if isinstance(output, Path):
+            output.unlink(missing_ok=True)
+        raise
+    progress.finished()
+    return output
+
+
+def append_epubs(
+    merged_path: Path | str,
+    input_paths: list[Path | str],
+    *,
+    output_path: Path | str | None = None,
+    input_order: bool = False,
+    workers: int = 1,
+    source_digest: str = "eager",
+    compression: CompressionPolicy | str | None = None,
+    compression_report: CompressionReport | None = None,
+    cache: SourceCache | None = None,
+    pool_digest: str = "sha256",
+    digest_memo: DigestMemo | None = None,
+    memory_budget: int | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> Path:
+    """Add new volumes to a tool-generated EPUB without rebuilding it."""
+    if not input_paths:
+        raise EpubMergeError("At least one input EPUB is required")
+    _check_options(workers, source_digest, pool_digest, memory_budget)
+    policy = resolve_policy(compression)
+    stats = resolve_stats(stats)
+    progress = resolve_progress(progress)
+    encode = _instrument_encode(functools.partial(policy.encode, report=compression_report), stats)
+    merged_path = Path(merged_path).expanduser()
+    output = Path(output_path).expanduser() if output_path is not None else merged_path
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(merged_path, "r") as existing:
+        try:
+            manifest = require_manifest(existing.read(MERGE_MANIFEST_PATH))
+            opf_items = read_package_items(existing.read("OEBPS/content.opf"), f"{merged_path.name}:content.opf")
+        except KeyError as exc:
+            raise ManifestError("missing epub-merge-tool manifest or content.opf") from exc
+        state = _MergeState(cache, ResourcePool(pool_digest, digest_memo), policy, memory_budget, stats, progress)
+        for item in opf_items:
+            if "nav" in item.properties:
+                continue
+            state.manifest_items.append(item)
+            state.manifest_href_ids[item.href] = item.item_id
+        _add_existing_resources(state.resource_pool, existing, merged_path, manifest, opf_items)
+
+        existing_merged = {
+            id(record): _existing_source(record, state.manifest_href_ids) for record in manifest["sources"]
+        }
+        stubs = [_source_stub(merged_path, record) for record in manifest["sources"]]
+        records = {id(stub): record for stub, record in zip(stubs, manifest["sources"])}
+        read = functools.partial(
+            read_source_books,
+            lazy=True,
+            digest=source_digest == "eager",
+            workers=workers,
+            cache=cache,
+            stats=stats,
+            progress=progress,
+        )
+        sources = _read_sources(
+            [*stubs, *(Path(path).expanduser() for path in input_paths)], read, input_order, stats
+        )
+        new_sources = [source for source in sources if id(source) not in records]
+        if manifest["structure"] == "flat":
+            _reject_duplicate_flat_titles(sources)
+
+        indexes = _free_source_indexes(existing, opf_items, len(manifest["sources"]), len(new_sources))
+        temp = tempfile.NamedTemporaryFile(dir=output.parent, prefix=f".{output.name}.", suffix=".tmp", delete=False)
+        try:
+            with temp, zipfile.ZipFile(temp, "w", compression=zipfile.ZIP_DEFLATED) as out:
+                write_mimetype_first(out)
+                write_epub_container(out)
+                with state.pipelined_writer(out, workers, encode) as writer:
+                    with stats.phase("copy_existing") as phase:
+                        for info in existing.infolist():
+                            if info.filename in REGENERATED_MEMBERS:
+                                continue
+                            progress.check()
+                            phase.add(members=1)
+                            state.zip_written.add(info.filename)
+                            if state.is_large(max(info.compress_size, info.file_size)):
+                                writer.write_streamed(
+                                    functools.partial(copy_raw_member, existing, info, arcname=info.filename)
+                                )
+                                continue
+                            raw = read_raw_member(existing, info)
+                            if raw is None:
+                                writer.writestr(info.filename, existing.read(info))
+                            else:
+                                writer.write_raw(info.filename, raw)
+                    merged = []
+                    for source_index, source in enumerate(sources):
+                        record = records.get(id(source))
+                        if record is not None:
+                            merged.append(existing_merged[id(record)])
+                            continue
+                        with stats.phase("source") as phase:
+                            merged.append(_merge_source(state, source, indexes.pop(0), writer, source_digest))
+                            phase.add(books=1, members=len(source.manifest_items))
+                        progress.emit(
+                            "source_merged", source=source.basename, index=source_index, total=len(sources)
+                        )
+                    with stats.phase("book_files"):
+                        _write_book_files(
+                            writer, state, manifest["structure"], manifest["title"], manifest["language"], merged
                         )
+                    with stats.phase("drain"):
+                        writer.close()
+            os.replace(temp.name, output)
+        except BaseException:
+            Path(temp.name).unlink(missing_ok=True)
+            raise
+    progress.finished()
+    return output
+
+
+class _MergeState:
+    def __init__(
+        self,
+        cache: SourceCache | None,
+        resource_pool: ResourcePool,
+        policy: CompressionPolicy,
+        memory_budget: int | None = None,
+        stats: MergeStats | None = None,
+        progress: Progress | None = None,
+        planned_hrefs: Mapping[tuple[str, str], str] | None = None,
+    ) -> None:
+        self.cache = cache
+        self.policy = policy
+        self.stats = resolve_stats(stats)
+        self.progress = resolve_progress(progress)
+        self.memory_budget = memory_budget
+        self.large_member = large_member_threshold(memory_budget)
+        self.manifest_items: list[ManifestItem] = []
+        self.resource_pool = resource_pool
+        self.manifest_href_ids: dict[str, str] = {}
+        self.zip_written: set[str] = set()
+        self.planned_hrefs = planned_hrefs
+
+    def pipelined_writer(self, out: zipfile.ZipFile, workers: int, encode) -> PipelinedZipWriter:
+        max_pending_bytes = self.memory_budget // 2 if self.memory_budget is not None else None
+        return PipelinedZipWriter(
+            out,
+            workers=workers,
+            max_pending_bytes=max_pending_bytes,
+            encode=encode,
+            stats=self.stats,
+            progress=self.progress,
+        )
+
+    def is_large(self, size: int | None) -> bool:
+        return self.large_member is not None and size is not None and size > self.large_member
+
+    def stream_compress_type(self, media_type: str) -> int:
+        return zipfile.ZIP_STORED if self.policy.stores(media_type) else zipfile.ZIP_DEFLATED
+
+
+@dataclass
+class _MergedSource:
+    title: str
+    spine_ids: list[str]
+    toc: list[TocEntry]
+    record: dict
+
+
+def _check_options(workers: int, source_digest: str, pool_digest: str, memory_budget: int | None) -> None:
+    if workers < 1:
+        raise EpubMergeError("workers must be at least 1")
+    if source_digest not in SOURCE_DIGEST_MODES:
+        raise EpubMergeError("source_digest must be 'eager', 'deferred' or 'skip'")
+    if pool_digest not in POOL_DIGESTS:
+        raise EpubMergeError("pool_digest must be 'sha256' or 'blake2b'")
+    if memory_budget is not None and memory_budget <= 0:
+        raise EpubMergeError("memory_budget must be positive")
+
+
+def _merge_source(
+    state: _MergeState,
+    source: SourceBook,
+    source_index: int,
+    writer: PipelinedZipWriter,
+    source_digest: str,
+) -> _MergedSource:
+    prefix = "" if source_index == 0 else f"v{source_index}/"
+    href_map: dict[str, str] = {}
+    id_map: dict[str, str] = {}
+    file_records: list[dict] = []
+    source_sha256 = source.sha256
+
+    with SourceReader(source, mapped=state.memory_budget is None) as reader:
+        for item in source.manifest_items:
+            if "nav" in item.properties:
+                continue
+            preferred_href = f"{prefix}{item.href}"
+            output_href = preferred_href
+            if can_pool(item.media_type):
+                if state.stats.enabled:
+                    started = time.perf_counter()
+                    hashed = state.resource_pool.hashed
+                size, crc = reader.size_and_crc(item.href)
+                output_href = state.resource_pool.resolve(
+                    item.media_type,
+                    size,
+                    crc,
+                    preferred_href,
+                    reader.location(item.href),
+                    functools.partial(reader.iter_chunks, item.href),
+                )
+                if state.stats.enabled:
+                    hit = output_href != preferred_href
+                    state.stats.add(
+                        "pool",
+                        time.perf_counter() - started,
+                        members=1,
+                        hits=int(hit),
+                        hashed=state.resource_pool.hashed - hashed,
+                        bytes_saved=size if hit else 0,
                     )
-                id_map[item.item_id] = owner_id
-                file_records.append(
-                    {
-                        "id": item.item_id,
-                        "href": item.href,
-                        "media_type": item.media_type,
-                        "properties": list(item.properties),
-                        "merged_href": output_href,
-                    }
+            if state.planned_hrefs is not None and state.planned_hrefs.get((source.basename, item.href)) != output_href:
+                raise ManifestError(
+                    f"{source.basename}: {item.href} no longer pools as planned; make a new plan"
                 )
-
-            for item in source.manifest_items:
-                if "nav" in item.properties:
-                    continue
-                data = source.item_data[item.href]
-                rewrite_map = _rewrite_map_for_item(item, prefix, href_map)
-                if rewrite_map:
-                    data = _rewrite_refs(data, rewrite_map)
-                    rewrites[item.href] = rewrite_map
-                output_href = href_map[item.href]
-                zip_name = f"OEBPS/{output_href}"
-                if zip_name not in zip_written:
-                    out.writestr(zip_name, data, compress_type=zipfile.ZIP_DEFLATED)
-                    zip_written.add(zip_name)
-
-            for item_id in source.spine_ids:
-                spine_ids.append(id_map[item_id])
-
-            remapped_toc = [
-                TocEntry(entry.title, _remap_toc_href(entry.href, href_map)) for entry in source.toc
-            ]
-            if first_href == "#" and remapped_toc:
-                first_href = remapped_toc[0].href
-            source_href = remapped_toc[0].href if remapped_toc else "#"
-            source_tocs.append((source.title, source_href, remapped_toc))
-            flat_toc.extend(remapped_toc)
-            manifest_sources.append(
+            href_map[item.href] = output_href
+            new_id = f"s{source_index}_{item.item_id}"
+            owner_id = state.manifest_href_ids.get(output_href)
+            if owner_id is None:
+                state.manifest_href_ids[output_href] = new_id
+                owner_id = new_id
+                state.manifest_items.append(
+                    ManifestItem(
+                        item_id=new_id,
+                        href=output_href,
+                        media_type=item.media_type,
+                        properties=tuple(prop for prop in item.properties if prop != "nav"),
+                    )
+                )
+            id_map[item.item_id] = owner_id
+            file_records.append(
                 {
-                    "basename": source.basename,
-                    "sha256": source.sha256,
-                    "title": source.title,
-                    "language": source.language,
-                    "creators": list(source.creators),
-                    "opf_path": source.opf_path,
-                    "files": file_records,
-                    "spine": list(source.spine_ids),
-                    "toc": [{"title": entry.title, "href": entry.href} for entry in source.toc],
-                    "rewrites": rewrites,
+                    "id": item.item_id,
+                    "href": item.href,
+                    "media_type": item.media_type,
+                    "properties": list(item.properties),
+                    "merged_href": output_href,
                 }
             )
 
-        if structure == "flat":
-            nav = build_flat_nav_html(book_title, first_href, flat_toc)
-        else:
-            nav = build_nav_html(book_title, first_href, source_tocs)
-        out.writestr("OEBPS/nav-merged.xhtml", nav, compress_type=zipfile.ZIP_DEFLATED)
-        out.writestr(
-            "OEBPS/content.opf",
-            build_opf(book_title, language, (), manifest_items, spine_ids),
-            compress_type=zipfile.ZIP_DEFLATED,
-        )
-        manifest = {
-            "schema": "epub-merge-tool/v1",
-            "tool_version": __version__,
-            "structure": structure,
-            "title": book_title,
-            "language": language,
-            "sources": manifest_sources,
-        }
-        out.writestr(
-            MERGE_MANIFEST_PATH,
-            json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
-            compress_type=zipfile.ZIP_DEFLATED,
+        rewrites = _write_source_members(state, source, reader, prefix, href_map, writer)
+        if source_digest == "deferred" or (source_digest == "eager" and source_sha256 is None):
+            started = time.perf_counter() if state.stats.enabled else 0.0
+            source_sha256 = reader.sha256()
+            if state.stats.enabled:
+                state.stats.add("hash_sources", time.perf_counter() - started, books=1)
+            if state.cache is not None:
+                state.cache.update_digest(source, source_sha256)
+
+    return _MergedSource(
+        title=source.title,
+        spine_ids=[id_map[item_id] for item_id in source.spine_ids],
+        toc=[TocEntry(entry.title, remap_toc_href(entry.href, href_map)) for entry in source.toc],
+        record={
+            "basename": source.basename,
+            "sha256": source_sha256,
+            "title": source.title,
+            "language": source.language,
+            "creators": list(source.creators),
+            "opf_path": source.opf_path,
+            "files": file_records,
+            "spine": list(source.spine_ids),
+            "toc": [{"title": entry.title, "href": entry.href} for entry in source.toc],
+            "rewrites": rewrites,
+        },
+    )
+
+
+def _write_book_files(
+    writer: PipelinedZipWriter,
+    state: _MergeState,
+    structure: str,
+    book_title: str,
+    language: str,
+    merged: list[_MergedSource],
+) -> None:
+    first_href = next((source.toc[0].href for source in merged if source.toc), "#")
+    if structure == "flat":
+        nav = build_flat_nav_html(book_title, first_href, [entry for source in merged for entry in source.toc])
+    else:
+        nav = build_nav_html(
+            book_title,
+            first_href,
+            [(source.title, source.toc[0].href if source.toc else "#", source.toc) for source in merged],
         )
-    return output
+    writer.writestr("OEBPS/nav-merged.xhtml", nav, "application/xhtml+xml")
+    writer.writestr(
+        "OEBPS/content.opf",
+        build_opf(
+            book_title,
+            language,
+            (),
+            state.manifest_items,
+            [item_id for source in merged for item_id in source.spine_ids],
+        ),
+        "application/oebps-package+xml",
+    )
+    manifest = {
+        "schema": "epub-merge-tool/v1",
+        "tool_version": __version__,
+        "structure": structure,
+        "title": book_title,
+        "language": language,
+        "sources": [source.record for source in merged],
+        "resource_pool": state.resource_pool.records(),
+    }
+    writer.writestr(
+        MERGE_MANIFEST_PATH,
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+        "application/json",
+    )
+    pooled_sizes = {record["href"]: record["size"] for record in manifest["resource_pool"]}
+    writer.writestr(
+        MERGE_SUMMARY_PATH,
+        json.dumps(summarize_manifest(manifest, pooled_sizes), ensure_ascii=False).encode("utf-8"),
+        "application/json",
+    )
 
 
-def _reject_duplicate_basenames(sources: list[SourceBook]) -> None:
+def _existing_source(record: dict, href_ids: dict[str, str]) -> _MergedSource:
+    href_map = {file_record["href"]: file_record["merged_href"] for file_record in record["files"]}
+    id_hrefs = {file_record["id"]: file_record["merged_href"] for file_record in record["files"]}
+    try:
+        spine_ids = [href_ids[id_hrefs[item_id]] for item_id in record["spine"]]
+    except KeyError as exc:
+        raise ManifestError(f"{record['basename']}: spine item {exc.args[0]!r} is not in the merged OPF") from exc
+    toc = [TocEntry(entry["title"], remap_toc_href(entry["href"], href_map)) for entry in record["toc"]]
+    return _MergedSource(record["title"], spine_ids, toc, record)
+
+
+def _source_stub(merged_path: Path, record: dict) -> SourceBook:
+    return SourceBook(
+        path=merged_path,
+        basename=record["basename"],
+        sha256=record.get("sha256"),
+        opf_path=record.get("opf_path", ""),
+        opf_dir="",
+        title=record["title"],
+        language=record.get("language") or "en",
+        creators=tuple(record.get("creators") or ()),
+        manifest_items=(),
+        spine_ids=tuple(record["spine"]),
+        toc=tuple(TocEntry(entry["title"], entry["href"]) for entry in record["toc"]),
+        item_data={},
+    )
+
+
+def _add_existing_resources(
+    pool: ResourcePool,
+    existing: zipfile.ZipFile,
+    merged_path: Path,
+    manifest: dict,
+    opf_items: list[ManifestItem],
+) -> None:
+    digests = {entry["href"]: entry.get("digest") for entry in manifest.get("resource_pool", ())}
+    for item in opf_items:
+        if not can_pool(item.media_type):
+            continue
+        member = f"OEBPS/{item.href}"
+        try:
+            info = existing.getinfo(member)
+        except KeyError as exc:
+            raise ManifestError(f"merged EPUB is missing pooled member {member!r}") from exc
+        pool.add(item.media_type, info.file_size, info.CRC, item.href, (merged_path, member), digests.get(item.href))
+
+
+def _free_source_indexes(existing: zipfile.ZipFile, opf_items: list[ManifestItem], start: int, count: int) -> list[int]:
+    used_prefixes = {
+        name.split("/", 2)[1] for name in existing.namelist() if name.startswith("OEBPS/v") and name.count("/") >= 2
+    }
+    used_ids = {item.item_id.partition("_")[0] for item in opf_items}
+    indexes: list[int] = []
+    index = max(start, 1)
+    while len(indexes) < count:
+        if f"v{index}" not in used_prefixes and f"s{index}" not in used_ids:
+            indexes.append(index)
+        index += 1
+    return indexes
+
+
+def _read_sources(
+    inputs: list[Path | SourceBook],
+    read: Callable[..., list[SourceBook]],
+    input_order: bool,
+    stats: MergeStats | _NullStats,
+) -> list[SourceBook]:
+    """Order ``inputs`` unless ``input_order`` is set, reading titles unhashed, then parse the paths still unread."""
+    _reject_duplicate_basenames(item.name if isinstance(item, Path) else item.basename for item in inputs)
+    if not input_order:
+        with stats.phase("order"):
+            inputs = sort_inputs(inputs, functools.partial(read, digest=False))
+    paths = [item for item in inputs if isinstance(item, Path)]
+    with stats.phase("read_sources") as phase:
+        books = iter(read(paths))
+        phase.add(books=len(paths))
+    return [next(books) if isinstance(item, Path) else item for item in inputs]
+
+
+def _reject_duplicate_basenames(basenames: Iterable[str]) -> None:
     seen: set[str] = set()
-    for source in sources:
-        basename = safe_basename(source.path)
+    for basename in basenames:
         if basename in seen:
             raise EpubMergeError(f"Duplicate source basename: {basename}")
         seen.add(basename)
@@ -203,36 +608,120 @@ def _reject_duplicate_flat_titles(sources: list[SourceBook]) -> None:
             seen[key] = source.basename
 
 
-def _can_pool(media_type: str) -> bool:
-    normalized = media_type.lower()
-    return normalized.startswith("image/") or normalized in IMAGE_OR_FONT_TYPES
+def _write_source_members(
+    state: _MergeState,
+    source: SourceBook,
+    reader: SourceReader,
+    prefix: str,
+    href_map: dict[str, str],
+    writer: PipelinedZipWriter,
+) -> dict[str, dict[str, str]]:
+    zip_written = state.zip_written
+    rewrites: dict[str, dict[str, str]] = {}
+    streamed = False
+    moved = any(final != f"{prefix}{original}" for original, final in href_map.items())
+    ref_cache: dict[tuple[str, str], str | None] = {}
+    for item in source.manifest_items:
+        if "nav" in item.properties:
+            continue
+        zip_name = f"OEBPS/{href_map[item.href]}"
+        if zip_name in zip_written:
+            continue
+        state.progress.check()
+        zip_written.add(zip_name)
+        if moved and _is_xhtml(item.media_type):
+            started = time.perf_counter() if state.stats.enabled else 0.0
+            data = reader.read(item.href)
+            rewrite_map = _rewrite_map_for_item(item, data, prefix, href_map, ref_cache)
+            if rewrite_map:
+                rewrites[item.href] = rewrite_map
+                rewritten = rewrite_refs(data, rewrite_map)
+                if state.stats.enabled:
+                    state.stats.add(
+                        "rewrite",
+                        time.perf_counter() - started,
+                        members=1,
+                        bytes_in=len(data),
+                        bytes_out=len(rewritten),
+                    )
+                writer.writestr(zip_name, rewritten, item.media_type)
+                continue
+        if state.is_large(reader.member_size(item.href)):
+            writer.write_streamed(
+                functools.partial(
+                    reader.copy_to,
+                    href=item.href,
+                    arcname=zip_name,
+                    compress_type=state.stream_compress_type(item.media_type),
+                )
+            )
+            streamed = True
+            continue
+        raw = reader.read_raw(item.href)
+        if raw is None or (raw.compress_type != zipfile.ZIP_STORED and state.policy.stores(item.media_type)):
+            writer.writestr(zip_name, reader.read(item.href), item.media_type)
+        else:
+            writer.write_raw(zip_name, raw)
+    if streamed:
+        writer.drain()
+    return rewrites
+
+
+def _instrument_encode(
+    encode: Callable[[bytes, str], RawMember], stats: MergeStats | _NullStats
+) -> Callable[[bytes, str], RawMember]:
+    if not stats.enabled:
+        return encode
+
+    def timed(data: bytes, media_type: str) -> RawMember:
+        started = time.perf_counter()
+        member = encode(data, media_type)
+        stats.add("encode", time.perf_counter() - started, members=1, bytes_in=len(data), bytes_out=len(member.data))
+        return member
+
+    return timed
+
+
+def _is_xhtml(media_type: str) -> bool:
+    return media_type.lower().endswith("xhtml+xml")
 
 
-def _rewrite_map_for_item(item: ManifestItem, prefix: str, href_map: dict[str, str]) -> dict[str, str]:
-    if not item.media_type.lower().endswith("xhtml+xml"):
-        return {}
+def _rewrite_map_for_item(
+    item: ManifestItem,
+    data: bytes,
+    prefix: str,
+    href_map: dict[str, str],
+    cache: dict[tuple[str, str], str | None],
+) -> dict[str, str]:
+    """Map the references ``data`` actually contains to their merged targets."""
+    source_dir = posixpath.dirname(item.href)
     mapping: dict[str, str] = {}
-    chapter_dir = posixpath.dirname(f"{prefix}{item.href}")
-    for original_href, final_href in href_map.items():
-        preferred_href = f"{prefix}{original_href}"
-        if final_href == preferred_href:
+    for ref in iter_ref_values(data):
+        if ref in mapping:
             continue
-        relative = posixpath.relpath(final_href, chapter_dir or ".")
-        mapping[original_href] = relative
+        key = (source_dir, ref)
+        if key not in cache:
+            cache[key] = _rewrite_ref(ref, source_dir, prefix, href_map)
+        rewritten = cache[key]
+        if rewritten is not None:
+            mapping[ref] = rewritten
     return mapping
 
 
-def _rewrite_refs(data: bytes, mapping: dict[str, str]) -> bytes:
-    text = data.decode("utf-8")
-    for old, new in mapping.items():
-        text = text.replace(f'src="{old}"', f'src="{new}"')
-        text = text.replace(f"src='{old}'", f"src='{new}'")
-        text = text.replace(f'href="{old}"', f'href="{new}"')
-        text = text.replace(f"href='{old}'", f"href='{new}'")
-    return text.encode("utf-8")
+def _rewrite_ref(ref: str, source_dir: str, prefix: str, href_map: dict[str, str]) -> str | None:
+    base, sep, fragment = ref.partition("#")
+    if not base or ":" in base or base.startswith("/"):
+        return None
+    original_href = posixpath.normpath(posixpath.join(source_dir, base))
+    final_href = href_map.get(original_href)
+    if final_href is None or final_href == f"{prefix}{original_href}":
+        return None
+    chapter_dir = f"{prefix}{source_dir}".rstrip("/")
+    relative = posixpath.relpath(final_href, chapter_dir or ".")
+    return f"{relative}{sep}{fragment}"
 
 
-def _remap_toc_href(href: str, href_map: dict[str, str]) -> str:
+def remap_toc_href(href: str, href_map: dict[str, str]) -> str:
     base, sep, fragment = href.partition("#")
     mapped = href_map.get(base)
     if mapped is None:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 
 
@@ -22,7 +23,7 @@ class ManifestItem:
 class SourceBook:
     path: Path
     basename: str
-    sha256: str
+    sha256: str | None
     opf_path: str
     opf_dir: str
     title: str
@@ -31,10 +32,14 @@ class SourceBook:
     manifest_items: tuple[ManifestItem, ...]
     spine_ids: tuple[str, ...]
     toc: tuple[TocEntry, ...]
-    item_data: dict[str, bytes] = field(repr=False)
+    item_data: dict[str, bytes] | None = field(default=None, repr=False)
 
     def item_by_id(self, item_id: str) -> ManifestItem:
+        return self._items_by_id[item_id]
+
+    @cached_property
+    def _items_by_id(self) -> dict[str, ManifestItem]:
+        items: dict[str, ManifestItem] = {}
         for item in self.manifest_items:
-            if item.item_id == item_id:
-                return item
-        raise KeyError(item_id)
+            items.setdefault(item.item_id, item)
+        return items
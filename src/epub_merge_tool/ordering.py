@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
+from typing import Callable
 
 from .errors import OrderingError
 from .models import SourceBook
@@ -24,35 +25,59 @@ CHINESE_DIGITS = {
 
 
 def sort_sources(sources: list[SourceBook]) -> list[SourceBook]:
-    keyed: list[tuple[tuple[int, ...], SourceBook]] = []
-    for source in sources:
-        key = order_key(source)
-        keyed.append((key, source))
-    seen: dict[tuple[int, ...], str] = {}
-    for key, source in keyed:
-        if key in seen:
-            raise OrderingError(
-                f"Ambiguous input order: {source.basename!r} and {seen[key]!r} share order key {key}"
-            )
-        seen[key] = source.basename
-    return [source for _, source in sorted(keyed, key=lambda item: item[0])]
+    keyed = [(order_key(source), source.basename, source) for source in sources]
+    _reject_shared_keys(keyed)
+    return [source for _, _, source in sorted(keyed, key=lambda item: item[0])]
+
+
+def sort_inputs(
+    inputs: list[Path | SourceBook],
+    read: Callable[[list[Path]], list[SourceBook]],
+) -> list[Path | SourceBook]:
+    """Order unread input paths and parsed sources as :func:`sort_sources` would."""
+    keyed: list[tuple[tuple[int, ...] | None, str, Path | SourceBook]] = []
+    pending: list[int] = []
+    for index, item in enumerate(inputs):
+        if isinstance(item, SourceBook):
+            keyed.append((order_key(item), item.basename, item))
+            continue
+        key = filename_order_key(item.name)
+        if key is None:
+            pending.append(index)
+        keyed.append((key, item.name, item))
+    _reject_shared_keys([entry for entry in keyed if entry[0] is not None])
+    if pending:
+        for index, source in zip(pending, read([keyed[index][2] for index in pending])):
+            keyed[index] = (order_key(source), source.basename, source)
+        _reject_shared_keys(keyed)
+    return [item for _, _, item in sorted(keyed, key=lambda entry: entry[0])]
 
 
 def order_key(source: SourceBook) -> tuple[int, ...]:
-    filename = Path(source.basename).stem
-    decimal = _decimal_key(filename)
-    if decimal:
-        return decimal
-    special = _special_key(filename)
-    if special:
-        return special
-    for text in (filename, source.title, source.toc[0].title if source.toc else ""):
+    key = filename_order_key(source.basename)
+    if key is not None:
+        return key
+    for text in (source.title, source.toc[0].title if source.toc else ""):
         numbers = _numbers(text)
         if numbers:
             return numbers
     raise OrderingError(f"Could not determine input order for {source.basename!r}")
 
 
+def filename_order_key(basename: str) -> tuple[int, ...] | None:
+    """Return the order key decided by ``basename`` alone, or ``None``."""
+    filename = Path(basename).stem
+    return _decimal_key(filename) or _special_key(filename) or _numbers(filename) or None
+
+
+def _reject_shared_keys(keyed: list[tuple[tuple[int, ...], str, object]]) -> None:
+    seen: dict[tuple[int, ...], str] = {}
+    for key, basename, _ in keyed:
+        if key in seen:
+            raise OrderingError(f"Ambiguous input order: {basename!r} and {seen[key]!r} share order key {key}")
+        seen[key] = basename
+
+
 def _numbers(text: str) -> tuple[int, ...]:
     return tuple(int(match) for match in re.findall(r"\d+", text))
 
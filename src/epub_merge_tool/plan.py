@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+from . import __version__
+from .cache import SourceCache
+from .compression import CompressionPolicy, CompressionReport
+from .epub_io import (
+    MERGE_MANIFEST_PATH,
+    MERGE_SUMMARY_PATH,
+    SourceReader,
+    build_flat_nav_html,
+    build_nav_html,
+    build_opf,
+    write_epub_container,
+    write_mimetype_first,
+)
+from .errors import EpubMergeError, ManifestError
+from .inspect import summarize_manifest
+from .merge import merge_sources, read_inputs, remap_toc_href
+from .models import ManifestItem, SourceBook, TocEntry
+from .ordering import order_key
+from .pool import DigestMemo, can_pool
+from .progress import Progress
+from .stats import MergeStats
+from .zip_io import deflate_member, write_raw_member
+
+
+PLAN_SCHEMA = "epub-merge-plan/v1"
+# Local file header plus central directory entry, excluding the name.
+ZIP_ENTRY_OVERHEAD = 30 + 46
+
+
+def plan_merge(
+    input_paths: list[Path | str],
+    *,
+    title: str | None = None,
+    structure: str = "volume",
+    input_order: bool = False,
+    workers: int = 1,
+    cache: SourceCache | None = None,
+) -> dict:
+    """Work out what :func:`~epub_merge_tool.merge.merge_epubs` would do, without merging."""
+    if structure not in {"volume", "flat"}:
+        raise EpubMergeError("structure must be 'volume' or 'flat'")
+    if not input_paths:
+        raise EpubMergeError("At least one input EPUB is required")
+    if workers < 1:
+        raise EpubMergeError("workers must be at least 1")
+    sources = read_inputs(input_paths, input_order=input_order, workers=workers, digest=False, cache=cache)
+
+    owners: dict[tuple[str, int, int], str] = {}
+    records = []
+    sizes: dict[str, int] = {}
+    for index, source in enumerate(sources):
+        record = _plan_source(source, index, owners)
+        record["order_key"] = None if input_order else list(order_key(source))
+        records.append(record)
+        for file_record in record["files"]:
+            sizes.setdefault(file_record["merged_href"], file_record["size"])
+    plan = {
+        "schema": PLAN_SCHEMA,
+        "tool_version": __version__,
+        "structure": structure,
+        "title": title,
+        "language": sources[0].language if sources else "en",
+        "input_order": input_order,
+        "sources": records,
+    }
+    plan["pool"] = summarize_manifest(plan, sizes)["pool"]
+    plan["flat_title_conflicts"] = _flat_title_conflicts(sources) if structure == "flat" else []
+    plan["estimated_bytes"] = _estimate_size(plan, sources)
+    return plan
+
+
+def merge_plan(
+    output_path: Path | str | BinaryIO,
+    plan: dict,
+    *,
+    title: str | None = None,
+    workers: int = 1,
+    source_digest: str = "eager",
+    compression: CompressionPolicy | str | None = None,
+    compression_report: CompressionReport | None = None,
+    cache: SourceCache | None = None,
+    pool_digest: str = "sha256",
+    digest_memo: DigestMemo | None = None,
+    memory_budget: int | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> Path | BinaryIO:
+    """Run a plan from :func:`plan_merge` without reordering or re-parsing its inputs."""
+    if plan.get("schema") != PLAN_SCHEMA:
+        raise ManifestError("unsupported merge plan schema")
+    if plan.get("flat_title_conflicts"):
+        raise ManifestError("plan has flat chapter title conflicts")
+    sources = [_planned_source(record) for record in plan["sources"]]
+    if progress is not None:
+        for source in sources:
+            progress.source_parsed(source.basename, len(source.manifest_items))
+    planned_hrefs = {
+        (record["basename"], file_record["href"]): file_record["merged_href"]
+        for record in plan["sources"]
+        for file_record in record["files"]
+    }
+    return merge_sources(
+        output_path,
+        sources,
+        title=title or plan.get("title"),
+        structure=plan["structure"],
+        planned_hrefs=planned_hrefs,
+        workers=workers,
+        source_digest=source_digest,
+        compression=compression,
+        compression_report=compression_report,
+        cache=cache,
+        pool_digest=pool_digest,
+        digest_memo=digest_memo,
+        memory_budget=memory_budget,
+        stats=stats,
+        progress=progress,
+    )
+
+
+def load_plan(path: Path | str) -> dict:
+    plan_file = Path(path).expanduser()
+    try:
+        plan = json.loads(plan_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ManifestError(f"Cannot read merge plan {plan_file}: {exc}") from exc
+    if not isinstance(plan, dict) or plan.get("schema") != PLAN_SCHEMA:
+        raise ManifestError(f"{plan_file} is not an epub-merge plan")
+    return plan
+
+
+def _plan_source(source: SourceBook, index: int, owners: dict[tuple[str, int, int], str]) -> dict:
+    prefix = "" if index == 0 else f"v{index}/"
+    stat = source.path.stat()
+    with SourceReader(source, mapped=False) as reader:
+        infos = {item.href: reader.info(item.href) for item in source.manifest_items if "nav" not in item.properties}
+    files = []
+    for item in source.manifest_items:
+        if "nav" in item.properties:
+            continue
+        info = infos[item.href]
+        merged_href = f"{prefix}{item.href}"
+        if can_pool(item.media_type):
+            merged_href = owners.setdefault((item.media_type.lower(), info.file_size, info.CRC), merged_href)
+        files.append(
+            {
+                "id": item.item_id,
+                "href": item.href,
+                "media_type": item.media_type,
+                "properties": list(item.properties),
+                "merged_href": merged_href,
+                "size": info.file_size,
+                "compressed_size": info.compress_size,
+                "crc32": info.CRC,
+            }
+        )
+    return {
+        "path": str(source.path.resolve()),
+        "basename": source.basename,
+        "file_size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "title": source.title,
+        "language": source.language,
+        "creators": list(source.creators),
+        "opf_path": source.opf_path,
+        "opf_dir": source.opf_dir,
+        "files": files,
+        "spine": list(source.spine_ids),
+        "toc": [{"title": entry.title, "href": entry.href} for entry in source.toc],
+    }
+
+
+def _planned_source(record: dict) -> SourceBook:
+    path = Path(record["path"])
+    try:
+        stat = path.stat()
+    except OSError as exc:
+        raise ManifestError(f"{record['basename']}: planned input is missing: {exc}") from exc
+    if (stat.st_size, stat.st_mtime_ns) != (record["file_size"], record["mtime_ns"]):
+        raise ManifestError(f"{record['basename']} changed since the plan was made; make a new plan")
+    items = tuple(
+        ManifestItem(
+            file_record["id"], file_record["href"], file_record["media_type"], tuple(file_record["properties"])
+        )
+        for file_record in record["files"]
+    )
+    return SourceBook(
+        path=path,
+        basename=record["basename"],
+        sha256=None,
+        opf_path=record["opf_path"],
+        opf_dir=record["opf_dir"],
+        title=record["title"],
+        language=record["language"],
+        creators=tuple(record["creators"]),
+        manifest_items=items,
+        spine_ids=tuple(record["spine"]),
+        toc=tuple(TocEntry(entry["title"], entry["href"]) for entry in record["toc"]),
+    )
+
+
+def _flat_title_conflicts(sources: list[SourceBook]) -> list[dict]:
+    seen: dict[str, str] = {}
+    conflicts = []
+    for source in sources:
+        for entry in source.toc:
+            key = entry.title.strip()
+            if key in seen:
+                conflicts.append({"title": entry.title, "sources": [seen[key], source.basename]})
+            else:
+                seen[key] = source.basename
+    return conflicts
+
+
+def _estimate_size(plan: dict, sources: list[SourceBook]) -> int:
+    """Estimate the merged file size from the planned members and regenerated book files."""
+    members: dict[str, int] = {}
+    for record in plan["sources"]:
+        for file_record in record["files"]:
+            members.setdefault(f"OEBPS/{file_record['merged_href']}", file_record["compressed_size"])
+    total = sum(ZIP_ENTRY_OVERHEAD + 2 * len(name.encode("utf-8")) + size for name, size in members.items())
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        write_mimetype_first(zf)
+        write_epub_container(zf)
+        for name, data in _book_files(plan, sources).items():
+            write_raw_member(zf, name, deflate_member(data))
+    return total + len(buffer.getvalue())
+
+
+def _book_files(plan: dict, sources: list[SourceBook]) -> dict[str, bytes]:
+    manifest_ids: dict[str, str] = {}
+    items: list[ManifestItem] = []
+    spine: list[str] = []
+    tocs: list[tuple[str, list[TocEntry]]] = []
+    for index, (record, source) in enumerate(zip(plan["sources"], sources)):
+        href_map = {}
+        id_map = {}
+        for file_record in record["files"]:
+            href_map[file_record["href"]] = file_record["merged_href"]
+            new_id = f"s{index}_{file_record['id']}"
+            owner_id = manifest_ids.setdefault(file_record["merged_href"], new_id)
+            if owner_id == new_id:
+                items.append(
+                    ManifestItem(
+                        new_id, file_record["merged_href"], file_record["media_type"], tuple(file_record["properties"])
+                    )
+                )
+            id_map[file_record["id"]] = owner_id
+        spine.extend(id_map[item_id] for item_id in source.spine_ids if item_id in id_map)
+        tocs.append(
+            (source.title, [TocEntry(entry.title, remap_toc_href(entry.href, href_map)) for entry in source.toc])
+        )
+    title = plan["title"] or "Merged"
+    first_href = next((toc[0].href for _, toc in tocs if toc), "#")
+    if plan["structure"] == "flat":
+        nav = build_flat_nav_html(title, first_href, [entry for _, toc in tocs for entry in toc])
+    else:
+        nav = build_nav_html(title, first_href, [(name, toc[0].href if toc else "#", toc) for name, toc in tocs])
+    return {
+        "OEBPS/nav-merged.xhtml": nav,
+        "OEBPS/content.opf": build_opf(title, plan["language"], (), items, spine),
+        MERGE_MANIFEST_PATH: json.dumps(plan["sources"], ensure_ascii=False, indent=2).encode("utf-8"),
+        MERGE_SUMMARY_PATH: json.dumps(plan["pool"], ensure_ascii=False).encode("utf-8"),
+    }
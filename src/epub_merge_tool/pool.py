@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .zip_io import COPY_CHUNK_SIZE
+
+
+POOL_DIGESTS = ("sha256", "blake2b")
+DEFAULT_MEMO_ENTRIES = 65536
+IMAGE_OR_FONT_TYPES = {
+    "font/ttf",
+    "font/otf",
+    "font/woff",
+    "font/woff2",
+    "application/font-sfnt",
+    "application/font-woff",
+    "application/vnd.ms-opentype",
+    "application/x-font-ttf",
+    "application/x-font-opentype",
+    "application/x-font-truetype",
+}
+
+
+@dataclass
+class _Candidate:
+    href: str
+    location: tuple[Path, str]
+    digest: str | None = None
+
+
+class DigestMemo:
+    """Thread-safe LRU of archive member digests, shared between pools."""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._digests: OrderedDict[tuple[str, str, int, int, str], str] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._digests)
+
+    def get_or_compute(self, key: tuple[str, str, int, int, str], compute: Callable[[], str]) -> str:
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+        if digest is None:
+            digest = compute()
+            with self._lock:
+                self._digests[key] = digest
+                self._digests.move_to_end(key)
+                while len(self._digests) > self.max_entries:
+                    self._digests.popitem(last=False)
+        return digest
+
+
+class ResourcePool:
+    """Deduplicate images and fonts across sources."""
+
+    def __init__(self, digest: str = "sha256", memo: DigestMemo | None = None) -> None:
+        if digest not in POOL_DIGESTS:
+            raise ValueError(f"pool digest must be one of {', '.join(POOL_DIGESTS)}")
+        self.digest = digest
+        self.memo = memo
+        self.hashed = 0
+        self._groups: dict[tuple[str, int, int], list[_Candidate]] = {}
+
+    def resolve(
+        self,
+        media_type: str,
+        size: int,
+        crc: int,
+        preferred_href: str,
+        location: tuple[Path, str],
+        load: Callable[[], Iterable[bytes]],
+    ) -> str:
+        """Return the pooled href for a member, registering it if it is new."""
+        key = (media_type.lower(), size, crc)
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = [_Candidate(preferred_href, location)]
+            return preferred_href
+        digest = self._digest_at(location, size, crc, load)
+        for candidate in group:
+            if candidate.digest is None:
+                candidate.digest = self._digest_at(
+                    candidate.location, size, crc, functools.partial(_read_location, candidate.location)
+                )
+            if candidate.digest == digest:
+                return candidate.href
+        group.append(_Candidate(preferred_href, location, digest))
+        return preferred_href
+
+    def add(
+        self,
+        media_type: str,
+        size: int,
+        crc: int,
+        href: str,
+        location: tuple[Path, str],
+        digest: str | None = None,
+    ) -> None:
+        if digest is not None and not digest.startswith(f"{self.digest}:"):
+            digest = None
+        self._groups.setdefault((media_type.lower(), size, crc), []).append(_Candidate(href, location, digest))
+
+    def records(self) -> list[dict]:
+        return [
+            {"media_type": media_type, "href": candidate.href, "size": size, "crc32": crc, "digest": candidate.digest}
+            for (media_type, size, crc), group in self._groups.items()
+            for candidate in group
+        ]
+
+    def _digest_at(
+        self, location: tuple[Path, str], size: int, crc: int, load: Callable[[], Iterable[bytes]]
+    ) -> str:
+        if self.memo is None:
+            return self._hash(load())
+        key = (str(location[0]), location[1], size, crc, self.digest)
+        return self.memo.get_or_compute(key, lambda: self._hash(load()))
+
+    def _hash(self, chunks: Iterable[bytes]) -> str:
+        self.hashed += 1
+        digest = hashlib.new(self.digest)
+        for chunk in chunks:
+            digest.update(chunk)
+        return f"{self.digest}:{digest.hexdigest()}"
+
+
+def can_pool(media_type: str) -> bool:
+    normalized = media_type.lower()
+    return normalized.startswith("image/") or normalized in IMAGE_OR_FONT_TYPES
+
+
+def _read_location(location: tuple[Path, str]) -> Iterator[bytes]:
+    path, member = location
+    with zipfile.ZipFile(path, "r") as zf, zf.open(member) as data:
+        while chunk := data.read(COPY_CHUNK_SIZE):
+            yield chunk
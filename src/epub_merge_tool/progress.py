@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from .errors import CancellationError
+
+
+class Progress:
+    """Progress events and cooperative cancellation for one merge, append or split."""
+
+    enabled = True
+
+    def __init__(self, callback: Callable[[dict], object] | None = None) -> None:
+        self.callback = callback
+        self.sources_parsed = 0
+        self.members_done = 0
+        self.bytes_done = 0
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise CancellationError("operation cancelled")
+
+    def emit(self, event: str, **fields: object) -> None:
+        if self.callback is not None:
+            self.callback({"event": event, **fields})
+
+    def source_parsed(self, source: str, members: int) -> None:
+        with self._lock:
+            self.sources_parsed += 1
+            sources_parsed = self.sources_parsed
+        self.emit("source_parsed", source=source, members=members, sources_parsed=sources_parsed)
+
+    def member_written(self, member: str, size: int) -> None:
+        with self._lock:
+            self.members_done += 1
+            self.bytes_done += size
+            members_done, bytes_done = self.members_done, self.bytes_done
+        self.emit("member_written", member=member, bytes=size, members_done=members_done, bytes_done=bytes_done)
+
+    def finished(self) -> None:
+        self.emit("finished", members_done=self.members_done, bytes_done=self.bytes_done)
+
+
+class _NullProgress:
+    """Stand-in used when no progress is requested; every call is a no-op."""
+
+    enabled = False
+    cancelled = False
+
+    def cancel(self) -> None:
+        return None
+
+    def check(self) -> None:
+        return None
+
+    def emit(self, event: str, **fields: object) -> None:
+        return None
+
+    def source_parsed(self, source: str, members: int) -> None:
+        return None
+
+    def member_written(self, member: str, size: int) -> None:
+        return None
+
+    def finished(self) -> None:
+        return None
+
+
+NULL_PROGRESS = _NullProgress()
+
+
+def resolve_progress(progress: Progress | None) -> Progress | _NullProgress:
+    return NULL_PROGRESS if progress is None else progress
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import re
+from typing import Iterator, Mapping
+
+
+_ATTR_VALUE = re.compile(rb"""(?:src|href)=(?:"([^"]*)"|'([^']*)')""")
+
+
+class RefRewriter:
+    """Rewrite quoted ``src=``/``href=`` attribute values in one scan over the bytes."""
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        self.mapping = {old.encode("utf-8"): new.encode("utf-8") for old, new in mapping.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self.mapping)
+
+    def __call__(self, data: bytes) -> bytes:
+        if not self.mapping:
+            return data
+        return _ATTR_VALUE.sub(self._replace, data)
+
+    def _replace(self, match: re.Match[bytes]) -> bytes:
+        group = 1 if match.start(1) != -1 else 2
+        new = self.mapping.get(match.group(group))
+        if new is None:
+            return match.group(0)
+        start, end = match.span(group)
+        whole = match.group(0)
+        offset = match.start()
+        return whole[: start - offset] + new + whole[end - offset :]
+
+
+def iter_ref_values(data: bytes) -> Iterator[str]:
+    for match in _ATTR_VALUE.finditer(data):
+        value = match.group(1) if match.start(1) != -1 else match.group(2)
+        try:
+            yield value.decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+
+
+def rewrite_refs(data: bytes, mapping: Mapping[str, str]) -> bytes:
+    return RefRewriter(mapping)(data)
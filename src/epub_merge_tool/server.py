@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import socket
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+from .cache import SourceCache
+from .errors import EpubMergeError
+from .inspect import inspect_epub
+from .merge import merge_epubs
+from .pool import DigestMemo
+from .split import split_epub
+
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+OPERATION_FAILED = -32000
+
+
+class MergeServer:
+    """Answer merge, split and inspect requests sent as line-delimited JSON-RPC 2.0."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 4,
+        cache: SourceCache | None = None,
+        source_digest: str = "eager",
+        pool_digest: str = "sha256",
+    ) -> None:
+        if workers < 1:
+            raise EpubMergeError("workers must be at least 1")
+        self.cache = cache if cache is not None else SourceCache()
+        self.memo = DigestMemo()
+        self.source_digest = source_digest
+        self.pool_digest = pool_digest
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="epub-merge-serve")
+        self._methods: dict[str, Callable[[dict], dict]] = {
+            "merge": self._merge,
+            "split": self._split,
+            "inspect": self._inspect,
+        }
+
+    def __enter__(self) -> MergeServer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def handle(self, line: str | bytes) -> dict | None:
+        """Run one request line on the calling thread and return its response."""
+        request, error = _parse_request(line)
+        if error is not None:
+            return error
+        return self._call(request)
+
+    def submit(self, line: str | bytes, respond: Callable[[dict], None]) -> Future | None:
+        """Queue one request line; ``respond`` receives its response from a worker thread."""
+        request, error = _parse_request(line)
+        if error is not None:
+            respond(error)
+            return None
+
+        def run() -> None:
+            response = self._call(request)
+            if response is not None:
+                respond(response)
+
+        return self._pool.submit(run)
+
+    def serve_stream(self, reader: BinaryIO, writer: BinaryIO) -> None:
+        """Serve requests read from ``reader`` until end of input, then wait for them to finish."""
+        lock = threading.Lock()
+        pending: set[Future] = set()
+
+        def respond(response: dict) -> None:
+            data = json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+            with lock:
+                try:
+                    writer.write(data)
+                    writer.flush()
+                except (OSError, ValueError):
+                    pass
+
+        def finished(future: Future) -> None:
+            with lock:
+                pending.discard(future)
+
+        for line in reader:
+            if not line.strip():
+                continue
+            future = self.submit(line, respond)
+            if future is not None:
+                with lock:
+                    pending.add(future)
+                future.add_done_callback(finished)
+        with lock:
+            remaining = list(pending)
+        wait(remaining)
+
+    def serve_unix(self, path: Path | str) -> None:
+        """Accept connections on a Unix domain socket at ``path`` until interrupted."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise EpubMergeError("Unix domain sockets are not available on this platform")
+        path = Path(path).expanduser()
+        _remove_stale_socket(path)
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                server.serve_stream(self.rfile, self.wfile)
+
+        with socketserver.ThreadingUnixStreamServer(str(path), Handler) as listener:
+            listener.daemon_threads = True
+            try:
+                listener.serve_forever()
+            finally:
+                path.unlink(missing_ok=True)
+
+    def _call(self, request: dict) -> dict | None:
+        request_id = request.get("id")
+        notification = "id" not in request
+        method = self._methods.get(request["method"])
+        if method is None:
+            response = _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {request['method']}")
+        else:
+            started = time.perf_counter()
+            try:
+                result = method(_params(request))
+            except _InvalidParams as exc:
+                response = _error(request_id, INVALID_PARAMS, str(exc))
+            except (EpubMergeError, OSError) as exc:
+                response = _error(request_id, OPERATION_FAILED, str(exc), {"type": type(exc).__name__})
+            except Exception as exc:
+                response = _error(request_id, INTERNAL_ERROR, str(exc), {"type": type(exc).__name__})
+            else:
+                result["seconds"] = round(time.perf_counter() - started, 6)
+                response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return None if notification else response
+
+    def _merge(self, params: dict) -> dict:
+        _check_keys(params, {"output", "inputs", "title", "structure", "input_order", "compression", "memory_budget"})
+        output = merge_epubs(
+            _path(params, "output"),
+            _paths(params, "inputs"),
+            title=_optional(params, "title", str),
+            structure=_optional(params, "structure", str) or "volume",
+            input_order=bool(_optional(params, "input_order", bool)),
+            source_digest=self.source_digest,
+            compression=_optional(params, "compression", str),
+            cache=self.cache,
+            pool_digest=self.pool_digest,
+            digest_memo=self.memo,
+            memory_budget=_optional(params, "memory_budget", int),
+        )
+        return {"output": str(output)}
+
+    def _split(self, params: dict) -> dict:
+        _check_keys(params, {"input", "out_dir", "only", "compression", "memory_budget"})
+        only = params.get("only")
+        if only is not None and (not isinstance(only, list) or not all(isinstance(item, str) for item in only)):
+            raise _InvalidParams("'only' must be a list of basenames")
+        outputs = split_epub(
+            _path(params, "input"),
+            _path(params, "out_dir"),
+            compression=_optional(params, "compression", str),
+            only=only,
+            memory_budget=_optional(params, "memory_budget", int),
+        )
+        return {"outputs": [str(output) for output in outputs]}
+
+    def _inspect(self, params: dict) -> dict:
+        _check_keys(params, {"path"})
+        return inspect_epub(_path(params, "path"))
+
+
+class _InvalidParams(Exception):
+    pass
+
+
+def _parse_request(line: str | bytes) -> tuple[dict | None, dict | None]:
+    try:
+        request = json.loads(line)
+    except ValueError as exc:
+        return None, _error(None, PARSE_ERROR, f"Invalid JSON: {exc}")
+    if isinstance(request, list):
+        return None, _error(None, INVALID_REQUEST, "Batch requests are not supported")
+    if (
+        not isinstance(request, dict)
+        or request.get("jsonrpc") != "2.0"
+        or not isinstance(request.get("method"), str)
+        or not _valid_id(request)
+    ):
+        request_id = request.get("id") if isinstance(request, dict) and _valid_id(request) else None
+        return None, _error(request_id, INVALID_REQUEST, "Expected a JSON-RPC 2.0 request object")
+    return request, None
+
+
+def _valid_id(request: dict) -> bool:
+    """JSON-RPC ids are strings, numbers or null; JSON booleans parse as ``bool``, a subclass of ``int``."""
+    request_id = request.get("id")
+    return request_id is None or (isinstance(request_id, (str, int)) and not isinstance(request_id, bool))
+
+
+def _error(request_id: object, code: int, message: str, data: dict | None = None) -> dict:
+    error: dict = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def _params(request: dict) -> dict:
+    params = request.get("params", {})
+    if not isinstance(params, dict):
+        raise _InvalidParams("params must be an object")
+    return params
+
+
+def _check_keys(params: dict, allowed: set[str]) -> None:
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise _InvalidParams(f"Unknown params: {', '.join(unknown)}")
+
+
+def _optional(params: dict, name: str, kind: type) -> object:
+    value = params.get(name)
+    if value is not None and (not isinstance(value, kind) or (kind is int and isinstance(value, bool))):
+        raise _InvalidParams(f"{name!r} must be of type {kind.__name__}")
+    return value
+
+
+def _path(params: dict, name: str) -> Path:
+    value = params.get(name)
+    if not isinstance(value, str) or not value:
+        raise _InvalidParams(f"{name!r} must be a non-empty path")
+    return Path(value).expanduser()
+
+
+def _paths(params: dict, name: str) -> list[Path]:
+    value = params.get(name)
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) and item for item in value):
+        raise _InvalidParams(f"{name!r} must be a non-empty list of paths")
+    return [Path(item).expanduser() for item in value]
+
+
+def _remove_stale_socket(path: Path) -> None:
+    try:
+        mode = path.stat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise EpubMergeError(f"Socket path {path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except ConnectionRefusedError:
+        path.unlink()
+    except OSError as exc:
+        raise EpubMergeError(f"Cannot use socket path {path}: {exc}") from exc
+    else:
+        raise EpubMergeError(f"Another server is already listening on {path}")
+    finally:
+        probe.close()
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 import warnings
 import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable
 
+from .compression import CompressionPolicy, CompressionReport, resolve_policy
 from .epub_io import (
     MERGE_MANIFEST_PATH,
     build_nav_html,
@@ -16,100 +22,290 @@ from .epub_io import (
 )
 from .errors import EpubMergeError, ManifestError
 from .models import ManifestItem, TocEntry
+from .progress import NULL_PROGRESS, Progress, _NullProgress, resolve_progress
+from .rewrite import rewrite_refs
+from .stats import NULL_STATS, MergeStats, _NullStats, resolve_stats
+from .zip_io import (
+    RawMember,
+    archive_offset,
+    copy_raw_member,
+    deflate_member,
+    large_member_threshold,
+    read_raw_member,
+    stream_member,
+    write_raw_member,
+)
 
 
-def split_epub(input_path: Path | str, out_dir: Path | str, *, heuristic: bool = False) -> list[Path]:
+def split_epub(
+    input_path: Path | str,
+    out_dir: Path | str,
+    *,
+    heuristic: bool = False,
+    compression: CompressionPolicy | str | None = None,
+    compression_report: CompressionReport | None = None,
+    workers: int = 1,
+    only: Iterable[str] | None = None,
+    memory_budget: int | None = None,
+    stats: MergeStats | None = None,
+    progress: Progress | None = None,
+) -> list[Path]:
+    """Rebuild the source EPUBs recorded in a merged EPUB's manifest."""
+    if workers < 1:
+        raise EpubMergeError("workers must be at least 1")
+    if memory_budget is not None and memory_budget <= 0:
+        raise EpubMergeError("memory_budget must be positive")
     input_path = Path(input_path).expanduser()
     out_dir = Path(out_dir).expanduser()
     out_dir.mkdir(parents=True, exist_ok=True)
+    policy = resolve_policy(compression)
+    stats = resolve_stats(stats)
+    progress = resolve_progress(progress)
 
     try:
         with zipfile.ZipFile(input_path, "r") as zf:
-            manifest = require_manifest(zf.read(MERGE_MANIFEST_PATH))
-            return _split_from_manifest(zf, manifest, out_dir)
+            with stats.phase("read_manifest"):
+                manifest = require_manifest(zf.read(MERGE_MANIFEST_PATH))
+            if only is not None:
+                manifest = {**manifest, "sources": _select_sources(manifest["sources"], only)}
+            outputs = _split_from_manifest(
+                zf,
+                manifest,
+                out_dir,
+                policy,
+                compression_report,
+                workers,
+                large_member_threshold(memory_budget),
+                stats,
+                progress,
+            )
+            progress.finished()
+            return outputs
     except KeyError as exc:
         if not heuristic:
             raise ManifestError("missing epub-merge-tool manifest; use --heuristic for best-effort split") from exc
+    if heuristic and only is not None:
+        raise ManifestError("selecting volumes requires an epub-merge-tool manifest")
     if heuristic:
         warnings.warn("heuristic split is best-effort and not logically lossless", UserWarning, stacklevel=2)
-        source = read_source_book(input_path)
+        source = read_source_book(input_path, lazy=True)
         output = out_dir / _safe_title_filename(source.title)
         output.write_bytes(input_path.read_bytes())
         return [output]
     raise EpubMergeError("unreachable split state")
 
 
-def _split_from_manifest(zf: zipfile.ZipFile, manifest: dict, out_dir: Path) -> list[Path]:
-    outputs: list[Path] = []
-    for source in manifest["sources"]:
-        basename = source["basename"]
-        output = out_dir / basename
-        items = [
-            ManifestItem(
-                item_id=file_record["id"],
-                href=file_record["href"],
-                media_type=file_record["media_type"],
-                properties=tuple(prop for prop in file_record.get("properties", []) if prop != "nav"),
-            )
+def _split_from_manifest(
+    zf: zipfile.ZipFile,
+    manifest: dict,
+    out_dir: Path,
+    policy: CompressionPolicy,
+    report: CompressionReport | None,
+    workers: int = 1,
+    large_member: int | None = None,
+    stats: MergeStats | _NullStats = NULL_STATS,
+    progress: Progress | _NullProgress = NULL_PROGRESS,
+) -> list[Path]:
+    sources = manifest["sources"]
+    shared = _SharedMembers(
+        zf,
+        Counter(
+            f"OEBPS/{file_record['merged_href']}"
+            for source in sources
             for file_record in source["files"]
+            if not _restores(zf, policy, file_record)
+        ),
+        large_member,
+    )
+    outputs = [out_dir / source["basename"] for source in sources]
+    if workers == 1 or len(sources) < 2:
+        for source, output in zip(sources, outputs):
+            _write_volume(zf, source, output, policy, report, shared, stats, progress)
+        return outputs
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_volume, zf, source, output, policy, report, shared, stats, progress)
+            for source, output in zip(sources, outputs)
         ]
-        spine_ids = source["spine"]
-        toc_entries = [TocEntry(entry["title"], entry["href"]) for entry in source["toc"]]
-        spine_hrefs = {
-            file_record["href"]: file_record["id"]
-            for file_record in source["files"]
-            if file_record["id"] in spine_ids
-        }
-        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as out:
-            write_mimetype_first(out)
-            write_epub_container(out)
-            out.writestr(
-                "OEBPS/nav.xhtml",
-                build_nav_html(
-                    source["title"],
-                    toc_entries[0].href if toc_entries else "#",
-                    [(entry.title, entry.href, []) for entry in toc_entries],
-                ),
-                compress_type=zipfile.ZIP_DEFLATED,
-            )
-            out.writestr(
-                "OEBPS/content.opf",
-                build_opf(
-                    source["title"],
-                    source.get("language") or "en",
-                    source.get("creators") or (),
-                    items,
-                    [spine_hrefs[_href_for_id(source["files"], item_id)] for item_id in spine_ids],
-                    nav_href="nav.xhtml",
-                ),
-                compress_type=zipfile.ZIP_DEFLATED,
-            )
-            rewrites = source.get("rewrites", {})
-            for file_record in source["files"]:
-                data = zf.read(f"OEBPS/{file_record['merged_href']}")
-                reverse = {new: old for old, new in rewrites.get(file_record["href"], {}).items()}
-                if reverse:
-                    data = _rewrite_refs(data, reverse)
-                out.writestr(f"OEBPS/{file_record['href']}", data, compress_type=zipfile.ZIP_DEFLATED)
-        outputs.append(output)
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
     return outputs
 
 
-def _href_for_id(files: list[dict], item_id: str) -> str:
-    for file_record in files:
-        if file_record["id"] == item_id:
-            return file_record["href"]
-    raise EpubMergeError(f"manifest spine references missing file id {item_id!r}")
+def _write_volume(
+    zf: zipfile.ZipFile,
+    source: dict,
+    output: Path,
+    policy: CompressionPolicy,
+    report: CompressionReport | None,
+    shared: _SharedMembers,
+    stats: MergeStats | _NullStats = NULL_STATS,
+    progress: Progress | _NullProgress = NULL_PROGRESS,
+) -> None:
+    try:
+        with stats.phase("volume") as phase:
+            _write_volume_members(zf, source, output, policy, report, shared, stats, progress)
+            size = output.stat().st_size
+            phase.add(members=len(source["files"]), bytes_out=size)
+    except BaseException:
+        output.unlink(missing_ok=True)
+        raise
+    progress.emit("volume_written", volume=output.name, bytes=size)
+
+
+def _write_volume_members(
+    zf: zipfile.ZipFile,
+    source: dict,
+    output: Path,
+    policy: CompressionPolicy,
+    report: CompressionReport | None,
+    shared: _SharedMembers,
+    stats: MergeStats | _NullStats,
+    progress: Progress | _NullProgress,
+) -> None:
+    items = [
+        ManifestItem(
+            item_id=file_record["id"],
+            href=file_record["href"],
+            media_type=file_record["media_type"],
+            properties=tuple(prop for prop in file_record.get("properties", []) if prop != "nav"),
+        )
+        for file_record in source["files"]
+    ]
+    spine_ids = source["spine"]
+    toc_entries = [TocEntry(entry["title"], entry["href"]) for entry in source["toc"]]
+    hrefs_by_id: dict[str, str] = {}
+    for file_record in source["files"]:
+        hrefs_by_id.setdefault(file_record["id"], file_record["href"])
+    spine_id_set = set(spine_ids)
+    spine_hrefs = {
+        file_record["href"]: file_record["id"]
+        for file_record in source["files"]
+        if file_record["id"] in spine_id_set
+    }
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as out:
+        write_mimetype_first(out)
+        write_epub_container(out)
+        nav = build_nav_html(
+            source["title"],
+            toc_entries[0].href if toc_entries else "#",
+            [(entry.title, entry.href, []) for entry in toc_entries],
+        )
+        write_raw_member(out, "OEBPS/nav.xhtml", policy.encode(nav, "application/xhtml+xml", report))
+        opf = build_opf(
+            source["title"],
+            source.get("language") or "en",
+            source.get("creators") or (),
+            items,
+            [spine_hrefs[_href_for_id(hrefs_by_id, item_id)] for item_id in spine_ids],
+            nav_href="nav.xhtml",
+        )
+        write_raw_member(out, "OEBPS/content.opf", policy.encode(opf, "application/oebps-package+xml", report))
+        rewrites = source.get("rewrites", {})
+        for file_record in source["files"]:
+            progress.check()
+            offset = archive_offset(out) if progress.enabled else 0
+            member = f"OEBPS/{file_record['merged_href']}"
+            arcname = f"OEBPS/{file_record['href']}"
+            reverse = {new: old for old, new in rewrites.get(file_record["href"], {}).items()}
+            rewritten = None
+            if reverse:
+                started = time.perf_counter() if stats.enabled else 0.0
+                data = zf.read(member)
+                rewritten = rewrite_refs(data, reverse)
+                if stats.enabled:
+                    stats.add(
+                        "rewrite",
+                        time.perf_counter() - started,
+                        members=1,
+                        bytes_in=len(data),
+                        bytes_out=len(rewritten),
+                    )
+                if rewritten == data:
+                    rewritten = None
+            if rewritten is None and _restores(zf, policy, file_record):
+                info = zf.getinfo(member)
+                if shared.is_large(info):
+                    stream_member(zf, info, out, arcname, zipfile.ZIP_STORED)
+                else:
+                    write_raw_member(out, arcname, policy.encode(zf.read(info), file_record["media_type"], report))
+            elif rewritten is None:
+                shared.copy(member, out, arcname)
+            else:
+                write_raw_member(out, arcname, policy.encode(rewritten, file_record["media_type"], report))
+            if progress.enabled:
+                progress.member_written(arcname, archive_offset(out) - offset)
 
 
-def _rewrite_refs(data: bytes, mapping: dict[str, str]) -> bytes:
-    text = data.decode("utf-8")
-    for old, new in mapping.items():
-        text = text.replace(f'src="{old}"', f'src="{new}"')
-        text = text.replace(f"src='{old}'", f"src='{new}'")
-        text = text.replace(f'href="{old}"', f'href="{new}"')
-        text = text.replace(f"href='{old}'", f"href='{new}'")
-    return text.encode("utf-8")
+class _SharedMembers:
+    """Members of the merged archive that several output volumes contain."""
+
+    def __init__(self, zf: zipfile.ZipFile, uses: Counter[str], large_member: int | None = None) -> None:
+        self.zf = zf
+        self.large_member = large_member
+        self._lock = threading.Lock()
+        self._remaining = {
+            member: count
+            for member, count in uses.items()
+            if count > 1 and (large_member is None or _member_size(zf, member) <= large_member)
+        }
+        self._raw: dict[str, RawMember] = {}
+
+    def is_large(self, info: zipfile.ZipInfo) -> bool:
+        return self.large_member is not None and max(info.compress_size, info.file_size) > self.large_member
+
+    def copy(self, member: str, out: zipfile.ZipFile, arcname: str) -> None:
+        info = self.zf.getinfo(member)
+        if member not in self._remaining:
+            copy_raw_member(self.zf, info, out, arcname)
+            return
+        with self._lock:
+            raw = self._raw.get(member)
+            if raw is None:
+                raw = read_raw_member(self.zf, info) or deflate_member(self.zf.read(info))
+                self._raw[member] = raw
+            self._remaining[member] -= 1
+            if not self._remaining[member]:
+                del self._raw[member]
+        write_raw_member(out, arcname, raw)
+
+
+def _restores(zf: zipfile.ZipFile, policy: CompressionPolicy, file_record: dict) -> bool:
+    """Whether a member stored deflated in ``zf`` must be re-encoded because the policy stores its type."""
+    if not policy.stores(file_record["media_type"]):
+        return False
+    try:
+        return zf.getinfo(f"OEBPS/{file_record['merged_href']}").compress_type != zipfile.ZIP_STORED
+    except KeyError:
+        return False
+
+
+def _member_size(zf: zipfile.ZipFile, member: str) -> int:
+    try:
+        info = zf.getinfo(member)
+        return max(info.compress_size, info.file_size)
+    except KeyError:
+        return 0
+
+
+def _select_sources(sources: list[dict], only: Iterable[str]) -> list[dict]:
+    wanted = set(only)
+    missing = sorted(wanted - {source["basename"] for source in sources})
+    if missing:
+        raise ManifestError(f"manifest has no source named {', '.join(missing)}")
+    return [source for source in sources if source["basename"] in wanted]
+
+
+def _href_for_id(hrefs_by_id: dict[str, str], item_id: str) -> str:
+    try:
+        return hrefs_by_id[item_id]
+    except KeyError:
+        raise EpubMergeError(f"manifest spine references missing file id {item_id!r}") from None
 
 
 def _safe_title_filename(title: str) -> str:
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class PhaseRecord:
+    """Counters collected while one phase is running."""
+
+    __slots__ = ("counters",)
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+
+    def add(self, **counters: int) -> None:
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+class MergeStats:
+    """Thread-safe wall time and counters per phase of a merge, append or split."""
+
+    enabled = True
+
+    def __init__(self, observer: Callable[[dict], None] | None = None) -> None:
+        self.observer = observer
+        self._lock = threading.Lock()
+        self._phases: dict[str, dict[str, float]] = {}
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def add(self, name: str, seconds: float = 0.0, **counters: int) -> None:
+        self._record(name, seconds, counters, None)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            phases = {
+                name: {
+                    key: round(value, 6) if isinstance(value, float) else value
+                    for key, value in sorted(totals.items())
+                }
+                for name, totals in self._phases.items()
+            }
+        return {"phases": phases, "peak_rss": _peak_rss()}
+
+    def _record(self, name: str, seconds: float, counters: dict[str, int], peak_rss: int | None) -> None:
+        with self._lock:
+            totals = self._phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            for key, value in counters.items():
+                totals[key] = totals.get(key, 0) + value
+            if peak_rss is not None:
+                totals["peak_rss"] = max(int(totals.get("peak_rss", 0)), peak_rss)
+
+
+class _Phase:
+    __slots__ = ("stats", "name", "record", "started")
+
+    def __init__(self, stats: MergeStats, name: str) -> None:
+        self.stats = stats
+        self.name = name
+        self.record = PhaseRecord()
+        self.started = 0.0
+
+    def __enter__(self) -> PhaseRecord:
+        self.started = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self.started
+        peak_rss = _peak_rss()
+        self.stats._record(self.name, seconds, self.record.counters, peak_rss)
+        if self.stats.observer is not None:
+            self.stats.observer(
+                {"phase": self.name, "seconds": round(seconds, 6), **self.record.counters, "peak_rss": peak_rss}
+            )
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> PhaseRecord:
+        return _NULL_RECORD
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+class _NullRecord(PhaseRecord):
+    def add(self, **counters: int) -> None:
+        return None
+
+
+class _NullStats:
+    """Stand-in used when no stats are requested; every call is a no-op."""
+
+    enabled = False
+    observer = None
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+    def add(self, name: str, seconds: float = 0.0, **counters: int) -> None:
+        return None
+
+    def as_dict(self) -> dict:
+        return {"phases": {}, "peak_rss": None}
+
+
+_NULL_PHASE = _NullPhase()
+_NULL_RECORD = _NullRecord()
+NULL_STATS = _NullStats()
+
+
+def resolve_stats(stats: MergeStats | None) -> MergeStats | _NullStats:
+    return NULL_STATS if stats is None else stats
+
+
+def _peak_rss() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
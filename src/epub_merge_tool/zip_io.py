@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import queue
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .progress import Progress, resolve_progress
+from .stats import MergeStats, resolve_stats
+
+
+COPY_CHUNK_SIZE = 1024 * 1024
+LARGE_MEMBER_DIVISOR = 8
+RAW_COPY_TYPES = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_MASK_ENCRYPTED = 0x01
+_DONE = object()
+# Members the tool generates get a fixed timestamp so identical inputs give identical output bytes.
+GENERATED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class RawMember:
+    """A zip member's compressed stream plus the header fields that describe it."""
+
+    compress_type: int
+    crc: int
+    file_size: int
+    data: bytes = field(repr=False)
+    date_time: tuple[int, int, int, int, int, int] | None = None
+
+
+def can_copy_raw(info: zipfile.ZipInfo) -> bool:
+    return info.compress_type in RAW_COPY_TYPES and not info.flag_bits & _MASK_ENCRYPTED
+
+
+def read_raw_member(source: zipfile.ZipFile, info: zipfile.ZipInfo) -> RawMember | None:
+    if not can_copy_raw(info) or not raw_access_supported(source):
+        return None
+    with source._lock:
+        source.fp.seek(_data_offset(source, info))
+        data = source.fp.read(info.compress_size)
+    if len(data) != info.compress_size:
+        raise zipfile.BadZipFile(f"Truncated zip member {info.filename!r}")
+    return RawMember(info.compress_type, info.CRC, info.file_size, data, info.date_time)
+
+
+def deflate_member(data: bytes, level: int = zlib.Z_DEFAULT_COMPRESSION) -> RawMember:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    return RawMember(zipfile.ZIP_DEFLATED, zlib.crc32(data), len(data), compressed)
+
+
+def write_raw_member(out: zipfile.ZipFile, arcname: str, member: RawMember) -> None:
+    if not raw_access_supported(out):
+        _write_recompressed(out, arcname, member)
+        return
+    with out._lock:
+        zinfo = _start_raw_entry(
+            out, arcname, member.compress_type, member.crc, len(member.data), member.file_size, member.date_time
+        )
+        out.fp.write(member.data)
+        _finish_raw_entry(out, zinfo)
+
+
+def copy_raw_member(source: zipfile.ZipFile, info: zipfile.ZipInfo, out: zipfile.ZipFile, arcname: str) -> None:
+    """Copy ``info`` from ``source`` into ``out`` without inflating it."""
+    if not can_copy_raw(info):
+        stream_member(source, info, out, arcname)
+        return
+    if not (raw_access_supported(source) and raw_access_supported(out)):
+        stream_member(source, info, out, arcname, info.compress_type)
+        return
+
+    with source._lock, out._lock:
+        data_offset = _data_offset(source, info)
+        zinfo = _start_raw_entry(
+            out, arcname, info.compress_type, info.CRC, info.compress_size, info.file_size, info.date_time
+        )
+        source.fp.seek(data_offset)
+        remaining = info.compress_size
+        while remaining:
+            chunk = source.fp.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated zip member {info.filename!r}")
+            out.fp.write(chunk)
+            remaining -= len(chunk)
+        _finish_raw_entry(out, zinfo)
+
+
+def stream_member(
+    source: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    out: zipfile.ZipFile,
+    arcname: str,
+    compress_type: int = zipfile.ZIP_DEFLATED,
+) -> zipfile.ZipInfo:
+    """Re-encode ``info`` into ``out`` in chunks, never holding the whole member."""
+    zinfo = zipfile.ZipInfo(arcname, date_time=info.date_time)
+    zinfo.compress_type = compress_type
+    zinfo.external_attr = 0o600 << 16
+    zinfo.file_size = info.file_size
+    with source.open(info) as src, out.open(zinfo, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dest:
+        while chunk := src.read(COPY_CHUNK_SIZE):
+            dest.write(chunk)
+    return zinfo
+
+
+def large_member_threshold(memory_budget: int | None) -> int | None:
+    """Size above which members are streamed instead of held in memory."""
+    if memory_budget is None:
+        return None
+    return max(memory_budget // LARGE_MEMBER_DIVISOR, COPY_CHUNK_SIZE)
+
+
+class PipelinedZipWriter:
+    """Append members to ``out`` in queue order from a background writer thread."""
+
+    def __init__(
+        self,
+        out: zipfile.ZipFile,
+        *,
+        workers: int = 1,
+        max_pending: int = 16,
+        max_pending_bytes: int | None = None,
+        encode: Callable[[bytes, str], RawMember] | None = None,
+        stats: MergeStats | None = None,
+        progress: Progress | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.out = out
+        self.max_pending_bytes = max_pending_bytes
+        self.stats = resolve_stats(stats)
+        self.progress = resolve_progress(progress)
+        self._encode = encode or _deflate_any
+        self._pending_bytes = 0
+        self._budget = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="epub-merge-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> PipelinedZipWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(raise_errors=exc is None)
+
+    def writestr(self, arcname: str, data: bytes, media_type: str = "application/octet-stream") -> None:
+        self._reserve(len(data))
+        self._put(arcname, self._pool.submit(self._encode, data, media_type), len(data))
+
+    def write_raw(self, arcname: str, member: RawMember) -> None:
+        self._reserve(len(member.data))
+        future: Future = Future()
+        future.set_result(member)
+        self._put(arcname, future, len(member.data))
+
+    def write_streamed(self, write: Callable[[zipfile.ZipFile], object]) -> None:
+        """Queue ``write(out)`` to run on the writer thread in archive order."""
+        future: Future = Future()
+        future.set_result(write)
+        self._put(None, future, 0)
+
+    def drain(self) -> None:
+        """Block until every queued entry has been written."""
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self, *, raise_errors: bool = True) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_DONE)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+        if raise_errors and self._error is not None:
+            raise self._error
+
+    def _reserve(self, size: int) -> None:
+        if self.max_pending_bytes is None:
+            return
+        with self._budget:
+            while (
+                self._pending_bytes
+                and self._pending_bytes + size > self.max_pending_bytes
+                and self._error is None
+            ):
+                self._budget.wait()
+            self._pending_bytes += size
+
+    def _release(self, size: int) -> None:
+        if self.max_pending_bytes is None:
+            return
+        with self._budget:
+            self._pending_bytes -= size
+            self._budget.notify_all()
+
+    def _put(self, arcname: str | None, future: Future, size: int) -> None:
+        if self._closed:
+            self._release(size)
+            raise ValueError("pipelined writer is closed")
+        if self._error is not None:
+            self._release(size)
+            raise self._error
+        self._queue.put((arcname, future, size))
+
+    def _drain(self) -> None:
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is _DONE:
+                    return
+                arcname, future, size = entry
+                try:
+                    if self._error is None:
+                        self.progress.check()
+                        result = future.result()
+                        measure = self.stats.enabled or self.progress.enabled
+                        if measure:
+                            started = time.perf_counter()
+                            offset = archive_offset(self.out)
+                        if arcname is None:
+                            result(self.out)
+                        else:
+                            write_raw_member(self.out, arcname, result)
+                        if measure:
+                            written = archive_offset(self.out) - offset
+                            self.stats.add("write", time.perf_counter() - started, members=1, bytes_out=written)
+                            self.progress.member_written(self.out.filelist[-1].filename, written)
+                except BaseException as exc:
+                    self._error = exc
+                finally:
+                    self._release(size)
+            finally:
+                self._queue.task_done()
+
+
+def _deflate_any(data: bytes, media_type: str) -> RawMember:
+    return deflate_member(data)
+
+
+def _write_recompressed(out: zipfile.ZipFile, arcname: str, member: RawMember) -> None:
+    data = member.data if member.compress_type == zipfile.ZIP_STORED else zlib.decompress(member.data, -15)
+    zinfo = zipfile.ZipInfo(arcname, date_time=member.date_time or GENERATED_DATE_TIME)
+    zinfo.compress_type = member.compress_type
+    zinfo.external_attr = 0o600 << 16
+    with out.open(zinfo, "w") as dest:
+        dest.write(data)
+
+
+# Raw copying writes entries through ZipFile internals. All access to them is
+# below; raw_access_supported checks they exist before the first raw copy and
+# callers fall back to the public API when they do not.
+_ZIPFILE_INTERNALS = ("fp", "_lock", "_writing", "_seekable", "_didModify", "_writecheck", "start_dir")
+_ZIPINFO_INTERNALS = ("FileHeader", "header_offset")
+_raw_access: bool | None = None
+
+
+def raw_access_supported(zf: zipfile.ZipFile) -> bool:
+    global _raw_access
+    if _raw_access is None:
+        _raw_access = all(hasattr(zf, name) for name in _ZIPFILE_INTERNALS) and all(
+            hasattr(zipfile.ZipInfo, name) for name in _ZIPINFO_INTERNALS
+        )
+    return _raw_access
+
+
+def archive_offset(zf: zipfile.ZipFile) -> int:
+    """Return the current write position of ``zf``, or 0 without raw access."""
+    return zf.fp.tell() if raw_access_supported(zf) else 0
+
+
+def _start_raw_entry(
+    out: zipfile.ZipFile,
+    arcname: str,
+    compress_type: int,
+    crc: int,
+    compress_size: int,
+    file_size: int,
+    date_time: tuple[int, int, int, int, int, int] | None,
+) -> zipfile.ZipInfo:
+    if out._writing:
+        raise ValueError("Can't write to the ZIP file while another write handle is open")
+    zinfo = zipfile.ZipInfo(arcname, date_time=date_time or GENERATED_DATE_TIME)
+    zinfo.compress_type = compress_type
+    zinfo.CRC = crc
+    zinfo.compress_size = compress_size
+    zinfo.file_size = file_size
+    zinfo.external_attr = 0o600 << 16
+    if out._seekable:
+        out.fp.seek(out.start_dir)
+    zinfo.header_offset = out.fp.tell()
+    out._writecheck(zinfo)
+    out._didModify = True
+    out.fp.write(zinfo.FileHeader(max(file_size, compress_size) > zipfile.ZIP64_LIMIT))
+    return zinfo
+
+
+def _finish_raw_entry(out: zipfile.ZipFile, zinfo: zipfile.ZipInfo) -> None:
+    out.start_dir = out.fp.tell()
+    out.filelist.append(zinfo)
+    out.NameToInfo[zinfo.filename] = zinfo
+
+
+def _data_offset(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> int:
+    zf.fp.seek(info.header_offset)
+    header = zf.fp.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename!r}")
+    fields = _LOCAL_HEADER.unpack(header)
+    name_length, extra_length = fields[-2], fields[-1]
+    return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> list[Path]:
+    spec = CorpusSpec(volumes=3, chapters=4, paragraphs=2, images=3, image_size=2048, shared_images=2)
+    return generate_corpus(spec, tmp_path / "corpus")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from epub_merge_tool.aio import merge_epubs_async, split_epub_async
+from epub_merge_tool.errors import CancellationError, EpubMergeError
+from epub_merge_tool.merge import merge_epubs
+from epub_merge_tool.progress import Progress
+
+
+def test_merge_reports_progress_on_the_loop(corpus: list[Path], tmp_path: Path) -> None:
+    events: list[dict] = []
+    output = asyncio.run(merge_epubs_async(tmp_path / "merged.epub", corpus, on_progress=events.append))
+
+    assert events[-1]["event"] == "finished"
+    with zipfile.ZipFile(output) as merged:
+        assert merged.testzip() is None
+
+
+def test_progress_option_is_rejected(corpus: list[Path], tmp_path: Path) -> None:
+    with pytest.raises(EpubMergeError, match="on_progress"):
+        asyncio.run(merge_epubs_async(tmp_path / "merged.epub", corpus, progress=Progress()))
+    with pytest.raises(EpubMergeError, match="on_progress"):
+        asyncio.run(split_epub_async(tmp_path / "merged.epub", tmp_path / "split", progress=Progress()))
+    assert not (tmp_path / "merged.epub").exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sources_are_reported_as_they_are_parsed(corpus: list[Path], tmp_path: Path, workers: int) -> None:
+    events: list[dict] = []
+    merge_epubs(tmp_path / "merged.epub", corpus, workers=workers, progress=Progress(events.append))
+
+    parsed = [event for event in events if event["event"] == "source_parsed"]
+    assert sorted(event["source"] for event in parsed) == sorted(path.name for path in corpus)
+    assert [event["sources_parsed"] for event in parsed] == [1, 2, 3]
+    assert events.index(parsed[-1]) < next(i for i, event in enumerate(events) if event["event"] == "member_written")
+
+
+def test_cancel_while_parsing_stops_before_the_next_source(corpus: list[Path], tmp_path: Path) -> None:
+    events: list[dict] = []
+    progress = Progress(lambda event: events.append(event) or progress.cancel())
+    with pytest.raises(CancellationError):
+        merge_epubs(tmp_path / "merged.epub", corpus, progress=progress)
+
+    assert [event["event"] for event in events] == ["source_parsed"]
+    assert not (tmp_path / "merged.epub").exists()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from pathlib import Path
+
+from epub_merge_tool.batch import load_jobs, run_batch
+
+
+def test_bad_records_fail_alone(corpus: list[Path], tmp_path: Path) -> None:
+    inputs = [str(path) for path in corpus]
+    lines = [
+        json.dumps({"output": "good.epub", "inputs": inputs}),
+        json.dumps({"inputs": inputs}),
+        json.dumps({"output": "unknown.epub", "inputs": inputs, "colour": "red"}),
+        "{not json",
+        json.dumps({"output": "twice.epub", "inputs": inputs}),
+        json.dumps({"output": "twice.epub", "inputs": inputs[:1]}),
+    ]
+    job_file = tmp_path / "jobs.jsonl"
+    job_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    results = {result["index"]: result for result in run_batch(load_jobs(job_file), workers=2)}
+
+    assert [results[index]["status"] for index in range(len(lines))] == ["ok", "error", "error", "error", "error", "error"]
+    assert results[1]["output"] is None
+    assert "unknown keys: colour" in results[2]["error"]
+    assert results[2]["output"] == str(tmp_path / "unknown.epub")
+    assert "not valid JSON" in results[3]["error"]
+    assert "same output" in results[4]["error"]
+    with zipfile.ZipFile(tmp_path / "good.epub") as merged:
+        assert merged.testzip() is None
+    assert not (tmp_path / "twice.epub").exists()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from epub_merge_tool.cache import SourceCache
+from epub_merge_tool.epub_io import read_source_book
+from epub_merge_tool.pool import DigestMemo
+from epub_merge_tool.server import MergeServer
+
+
+def test_source_cache_evicts_least_recently_used(corpus: list[Path]) -> None:
+    cache = SourceCache(max_entries=2)
+    first, second, third = (read_source_book(path, lazy=True) for path in corpus)
+    cache.put(first)
+    cache.put(second)
+    assert cache.get(first.path) is not None
+    cache.put(third)
+
+    assert len(cache) == 2
+    assert cache.get(second.path) is None
+    assert cache.get(first.path) is not None
+    assert cache.get(third.path) is not None
+
+
+def test_digest_memo_evicts_least_recently_used() -> None:
+    memo = DigestMemo(max_entries=2)
+    computed: list[str] = []
+
+    def digest(name: str) -> str:
+        return memo.get_or_compute(("book.epub", name, 1, 1, "sha256"), lambda: computed.append(name) or name)
+
+    digest("a")
+    digest("b")
+    digest("a")
+    digest("c")
+    digest("a")
+    digest("b")
+
+    assert len(memo) == 2
+    assert computed == ["a", "b", "c", "b"]
+
+
+def test_server_caches_stay_bounded(corpus: list[Path], tmp_path: Path) -> None:
+    params = {"output": str(tmp_path / "merged.epub"), "inputs": [str(path) for path in corpus]}
+    with MergeServer(workers=1, cache=SourceCache(max_entries=1)) as server:
+        server.memo = DigestMemo(max_entries=1)
+        response = server.handle(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "merge", "params": params}))
+
+    assert "result" in response
+    assert len(server.cache) == 1
+    assert len(server.memo) == 1
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from epub_merge_tool.cli import main
+
+
+def test_stats_and_compression_report_print_one_document(corpus: list[Path], tmp_path: Path, capsys) -> None:
+    argv = ["merge", "--stats", "json", "--compression-report", str(tmp_path / "merged.epub"), *map(str, corpus)]
+    assert main(argv) == 0
+
+    document = json.loads(capsys.readouterr().out)
+    assert set(document) == {"compression", "stats"}
+    assert document["compression"]["entries"]
+    assert "parse" in document["stats"]["phases"]
+
+
+def test_negative_cache_size_is_a_usage_error(corpus: list[Path], tmp_path: Path, capsys) -> None:
+    argv = ["merge", "--cache-dir", str(tmp_path / "cache"), "--cache-max-mb", "-1", str(tmp_path / "merged.epub")]
+    with pytest.raises(SystemExit) as exc_info:
+        main([*argv, *map(str, corpus)])
+
+    assert exc_info.value.code == 2
+    assert "--cache-max-mb" in capsys.readouterr().err
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+from epub_merge_tool.compression import CompressionReport
+from epub_merge_tool.merge import merge_epubs
+from epub_merge_tool.split import split_epub
+
+
+def _deflate_everything(path: Path) -> None:
+    with zipfile.ZipFile(path) as source:
+        members = [(info, source.read(info)) for info in source.infolist()]
+    with zipfile.ZipFile(path, "w") as out:
+        for info, data in members:
+            method = zipfile.ZIP_STORED if info.filename == "mimetype" else zipfile.ZIP_DEFLATED
+            out.writestr(info.filename, data, compress_type=method)
+
+
+def test_media_preset_stores_deflated_images(corpus: list[Path], tmp_path: Path) -> None:
+    for path in corpus:
+        _deflate_everything(path)
+    report = CompressionReport()
+    output = merge_epubs(tmp_path / "merged.epub", corpus, compression="media", compression_report=report)
+
+    with zipfile.ZipFile(output) as merged:
+        assert merged.testzip() is None
+        images = [info for info in merged.infolist() if info.filename.endswith(".png")]
+        chapters = [info for info in merged.infolist() if info.filename.endswith(".xhtml")]
+    assert images and all(info.compress_type == zipfile.ZIP_STORED for info in images)
+    assert chapters and all(info.compress_type == zipfile.ZIP_DEFLATED for info in chapters)
+    stored = [entry for entry in report.as_dict()["entries"] if entry["media_type"] == "image/png"]
+    assert [entry["method"] for entry in stored] == ["store"]
+    assert stored[0]["members"] == len(images)
+
+
+def test_default_policy_copies_deflated_images_raw(corpus: list[Path], tmp_path: Path) -> None:
+    for path in corpus:
+        _deflate_everything(path)
+    output = merge_epubs(tmp_path / "merged.epub", corpus)
+
+    with zipfile.ZipFile(output) as merged:
+        images = [info for info in merged.infolist() if info.filename.endswith(".png")]
+    assert images and all(info.compress_type == zipfile.ZIP_DEFLATED for info in images)
+
+
+def test_split_media_preset_stores_deflated_images(corpus: list[Path], tmp_path: Path) -> None:
+    for path in corpus:
+        _deflate_everything(path)
+    merged = merge_epubs(tmp_path / "merged.epub", corpus)
+    report = CompressionReport()
+    volumes = split_epub(merged, tmp_path / "split", compression="media", compression_report=report, workers=2)
+
+    assert len(volumes) == len(corpus)
+    for volume in volumes:
+        with zipfile.ZipFile(volume) as out:
+            assert out.testzip() is None
+            images = [info for info in out.infolist() if info.filename.endswith(".png")]
+        assert images and all(info.compress_type == zipfile.ZIP_STORED for info in images)
+    stored = [entry for entry in report.as_dict()["entries"] if entry["media_type"] == "image/png"]
+    assert [entry["method"] for entry in stored] == ["store"]
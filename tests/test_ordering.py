@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from epub_merge_tool import epub_io
+from epub_merge_tool.epub_io import MERGE_MANIFEST_PATH
+from epub_merge_tool.errors import OrderingError
+from epub_merge_tool.merge import merge_epubs
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> list[Path]:
+    paths: list[Path] = []
+    sha256 = epub_io.MappedArchive.sha256
+
+    def record(archive: epub_io.MappedArchive) -> str:
+        paths.append(archive.path)
+        return sha256(archive)
+
+    monkeypatch.setattr(epub_io.MappedArchive, "sha256", record)
+    return paths
+
+
+def _unnumbered(corpus: list[Path], tmp_path: Path, names: str) -> list[Path]:
+    inputs = []
+    for name, source in zip(names, corpus):
+        inputs.append(tmp_path / "inputs" / f"book-{name}.epub")
+        inputs[-1].parent.mkdir(exist_ok=True)
+        shutil.copyfile(source, inputs[-1])
+    return inputs
+
+
+def test_ordering_by_title_hashes_each_input_once(corpus: list[Path], tmp_path: Path, hashed: list[Path]) -> None:
+    inputs = _unnumbered(sorted(corpus), tmp_path, "cab")
+    output = merge_epubs(tmp_path / "merged.epub", inputs)
+
+    with zipfile.ZipFile(output) as merged:
+        manifest = json.loads(merged.read(MERGE_MANIFEST_PATH))
+    assert [source["basename"] for source in manifest["sources"]] == [path.name for path in inputs]
+    assert [source["sha256"] for source in manifest["sources"]] == [
+        hashlib.sha256(path.read_bytes()).hexdigest() for path in inputs
+    ]
+    assert sorted(hashed) == sorted(inputs)
+
+
+def test_failed_ordering_hashes_nothing(corpus: list[Path], tmp_path: Path, hashed: list[Path]) -> None:
+    inputs = _unnumbered([corpus[0], corpus[0]], tmp_path, "ab")
+    with pytest.raises(OrderingError):
+        merge_epubs(tmp_path / "merged.epub", inputs)
+    assert hashed == []
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from epub_merge_tool.epub_io import MERGE_MANIFEST_PATH
+from epub_merge_tool.errors import ManifestError
+from epub_merge_tool.merge import merge_epubs
+from epub_merge_tool.plan import merge_plan, plan_merge
+
+
+def _source_digests(path: Path) -> list[str | None]:
+    with zipfile.ZipFile(path) as merged:
+        manifest = json.loads(merged.read(MERGE_MANIFEST_PATH))
+    return [source["sha256"] for source in manifest["sources"]]
+
+
+@pytest.mark.parametrize("source_digest", ["eager", "deferred"])
+def test_plan_records_source_digests(corpus: list[Path], tmp_path: Path, source_digest: str) -> None:
+    output = merge_plan(tmp_path / "merged.epub", plan_merge(corpus), source_digest=source_digest)
+
+    expected = [hashlib.sha256(path.read_bytes()).hexdigest() for path in sorted(corpus)]
+    assert _source_digests(output) == expected
+
+
+def test_plan_matches_direct_merge(corpus: list[Path], tmp_path: Path) -> None:
+    plan = plan_merge(corpus)
+    planned = merge_plan(tmp_path / "planned" / "merged.epub", plan)
+    direct = merge_epubs(tmp_path / "direct" / "merged.epub", corpus)
+
+    assert planned.read_bytes() == direct.read_bytes()
+    assert plan["pool"]["shared_resources"] == 2
+    assert abs(plan["estimated_bytes"] - direct.stat().st_size) < direct.stat().st_size * 0.05
+
+
+def test_changed_input_is_rejected(corpus: list[Path], tmp_path: Path) -> None:
+    plan = plan_merge(corpus)
+    stat = corpus[1].stat()
+    os.utime(corpus[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    with pytest.raises(ManifestError, match="changed since the plan"):
+        merge_plan(tmp_path / "merged.epub", plan)
+    assert not (tmp_path / "merged.epub").exists()
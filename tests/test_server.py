@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from epub_merge_tool.server import INVALID_REQUEST, METHOD_NOT_FOUND, MergeServer
+
+
+@pytest.mark.parametrize(
+    ("request_id", "code"),
+    [(None, METHOD_NOT_FOUND), ("a", METHOD_NOT_FOUND), (7, METHOD_NOT_FOUND), (True, INVALID_REQUEST)],
+)
+def test_request_ids(request_id: object, code: int) -> None:
+    with MergeServer(workers=1) as server:
+        response = server.handle(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "unknown"}))
+
+    assert response["id"] == (None if isinstance(request_id, bool) else request_id)
+    assert response["error"]["code"] == code
+
+
+def test_notifications_get_no_response() -> None:
+    with MergeServer(workers=1) as server:
+        assert server.handle(json.dumps({"jsonrpc": "2.0", "method": "unknown"})) is None
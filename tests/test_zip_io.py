@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from epub_merge_tool import zip_io
+from epub_merge_tool.merge import merge_epubs
+
+
+@pytest.fixture(params=[True, False], ids=["raw", "fallback"])
+def raw_access(request, monkeypatch) -> bool:
+    monkeypatch.setattr(zip_io, "_raw_access", None if request.param else False)
+    return request.param
+
+
+def test_raw_copies_reopen_cleanly(tmp_path: Path, raw_access: bool) -> None:
+    source_path = tmp_path / "source.zip"
+    with zipfile.ZipFile(source_path, "w") as source:
+        source.writestr("stored.txt", b"stored " * 100, compress_type=zipfile.ZIP_STORED)
+        source.writestr("deflated.txt", b"deflated " * 100, compress_type=zipfile.ZIP_DEFLATED)
+
+    out_path = tmp_path / "out.zip"
+    with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(out_path, "w") as out:
+        for info in source.infolist():
+            zip_io.copy_raw_member(source, info, out, f"copy/{info.filename}")
+        zip_io.write_raw_member(out, "written.txt", zip_io.deflate_member(b"written " * 100))
+    assert zip_io.raw_access_supported(out) is raw_access
+
+    with zipfile.ZipFile(out_path) as reopened:
+        assert reopened.testzip() is None
+        assert reopened.read("copy/stored.txt") == b"stored " * 100
+        assert reopened.read("copy/deflated.txt") == b"deflated " * 100
+        assert reopened.read("written.txt") == b"written " * 100
+        assert reopened.getinfo("copy/stored.txt").compress_type == zipfile.ZIP_STORED
+        assert reopened.getinfo("copy/deflated.txt").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_merged_epub_reopens_cleanly(corpus: list[Path], tmp_path: Path, raw_access: bool) -> None:
+    output = merge_epubs(tmp_path / "merged.epub", corpus, memory_budget=4096)
+    with zipfile.ZipFile(output) as merged:
+        assert merged.testzip() is None
+        assert merged.namelist()[0] == "mimetype"
+        assert merged.getinfo("mimetype").compress_type == zipfile.ZIP_STORED
+
+
+def test_merge_output_is_reproducible(corpus: list[Path], tmp_path: Path, raw_access: bool) -> None:
+    first = merge_epubs(tmp_path / "first" / "merged.epub", corpus)
+    second = merge_epubs(tmp_path / "second" / "merged.epub", corpus)
+    assert first.read_bytes() == second.read_bytes()